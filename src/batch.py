@@ -0,0 +1,155 @@
+"""
+Command line batch mode, which loads the movie graph once and answers all queries from an input file, writing one
+json result per line to an output file as it goes.
+
+The input is either a jsonl file with one json object per line, holding the name of the 'query' and its parameters
+(see queries.run_query):
+
+    {"query": "collaborative_performance", "actors": ["Brad Pitt", "Edward Norton"]}
+    {"query": "casting_team", "actor": "Tom Hanks", "number_of_actors": 5, "min_num_collab": 3}
+
+or a tsv file with the name of the query in the first column, followed by its parameters (actors separated by
+commas and spaces, like in the interface) and optionally the scoring method and genre:
+
+    best_movie	Christian Bale, Heath Ledger, Gary Oldman
+    best_movie	Christian Bale, Heath Ledger, Gary Oldman	Action
+    casting_team	Morgan Freeman	5	2	bayesian	Drama
+    lookup	Tom Hanks
+
+Example:
+    python batch.py queries.tsv results.jsonl --workers 4
+"""
+from __future__ import annotations
+from typing import Any, Iterator, TextIO
+import argparse
+import itertools
+import json
+
+import datastructures
+import queries
+
+
+def parse_tsv_line(line: str) -> tuple[str, dict[str, Any]]:
+    """Return the query name and parameters of a line of a tsv input file. Raise a ValueError if it is malformed."""
+    fields = line.rstrip("\r\n").split("\t")
+    query, args = fields[0], fields[1:]
+    if args == [] or args[0] == "":
+        raise ValueError("Missing parameters")
+
+    if query == "lookup":
+        return query, {"name": args[0]}
+    elif query == "casting_team":
+        params = dict(zip(["actor", "number_of_actors", "min_num_collab", "method", "genre"], args))
+        return query, params
+    elif query == "similar_actors":
+        return query, dict(zip(["actor", "number_of_actors", "num_perm", "bands"], args))
+    elif query == "timeline":
+        return query, dict(zip(["actors", "start_year", "end_year"], args))
+    elif query == "best_movie":
+        return query, dict(zip(["actors", "genre"], args))
+    else:
+        return query, dict(zip(["actors", "method", "genre"], args))
+
+
+def parse_jsonl_line(line: str) -> tuple[str, dict[str, Any]]:
+    """Return the query name and parameters of a line of a jsonl input file. Raise a ValueError if it is malformed."""
+    params = json.loads(line)
+    if not isinstance(params, dict) or not isinstance(params.get("query"), str):
+        raise ValueError("Every line has to be a json object with a 'query'")
+    return params.pop("query"), params
+
+
+def read_queries(input_file: TextIO, file_format: str) -> Iterator[tuple[int, str, dict[str, Any] | str]]:
+    """
+    Yield the line number, query name and parameters of every query in the input file, skipping empty lines and
+    lines starting with #. If a line can't be parsed, its parameters are replaced by the error message.
+    """
+    parse = parse_tsv_line if file_format == "tsv" else parse_jsonl_line
+    for number, line in enumerate(input_file, 1):
+        if line.strip() == "" or line.startswith("#"):
+            continue
+        try:
+            query, params = parse(line)
+        except ValueError as error:
+            yield number, "", str(error)
+        else:
+            yield number, query, params
+
+
+def answer(graph: datastructures.Graph | None, query: str, params: dict[str, Any] | str) -> dict[str, Any]:
+    """
+    Return the result of a query from read_queries as a dictionary holding either the 'result' or the 'error'. If
+    graph is None, the query is answered on the graph of the worker process.
+    """
+    if isinstance(params, str):
+        return {"error": params}
+    try:
+        if graph is None:
+            return {"query": query, "result": queries.run_in_worker(query, params)}
+        return {"query": query, "result": queries.run_query(graph, query, params)}
+    except ValueError as error:
+        return {"query": query, "error": str(error)}
+
+
+def _answer_in_worker(item: tuple[str, dict[str, Any] | str]) -> dict[str, Any]:
+    """Answer a query in a worker process, see answer."""
+    return answer(None, *item)
+
+
+def run_batch(graph: datastructures.Graph, input_file: TextIO, output_file: TextIO, file_format: str,
+              files: tuple[str, str, str, str], workers: int = 0, chunk_size: int = 256) -> int:
+    """
+    Answer all queries of the input file and write the results to the output file, in the order of the input. Return
+    the number of queries answered.
+
+    Queries are read in chunks of chunk_size per worker, so only one chunk of queries and results is held in memory
+    at a time. With workers > 0, every chunk is answered by a pool of worker processes.
+    """
+    pool = queries.start_worker_pool(graph, files, workers) if workers > 0 else None
+    lines = read_queries(input_file, file_format)
+    answered = 0
+    try:
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size * max(1, workers)))
+            if chunk == []:
+                break
+
+            items = [(query, params) for _, query, params in chunk]
+            if pool is None:
+                results = [answer(graph, query, params) for query, params in items]
+            else:
+                results = pool.map(_answer_in_worker, items, chunksize=chunk_size)
+
+            for (number, _, _), result in zip(chunk, results):
+                output_file.write(json.dumps({"line": number, **result}) + "\n")
+            answered += len(chunk)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return answered
+
+
+def main() -> None:
+    """Run the batch mode from the command line."""
+    parser = argparse.ArgumentParser(description="Answer movie graph queries from a file.")
+    parser.add_argument('input', help="tsv or jsonl file with one query per line")
+    parser.add_argument('output', help="jsonl file to write the results to")
+    parser.add_argument('--format', choices=['tsv', 'jsonl'], default=None,
+                        help="format of the input file (default: from its extension)")
+    parser.add_argument('--workers', type=int, default=0, help="number of worker processes, 0 to answer in this one")
+    parser.add_argument('--chunk-size', type=int, default=256, help="number of queries per worker and chunk")
+    parser.add_argument('--files', nargs=4, default=queries.SAMPLE_DATASET,
+                        metavar=('ACTORS', 'TITLES', 'RATINGS', 'PRINCIPALS'), help="dataset files to load")
+    args = parser.parse_args()
+
+    file_format = args.format or ("tsv" if args.input.endswith(".tsv") else "jsonl")
+    files = tuple(args.files)
+    graph = queries.load_graph(*files)
+    with (open(args.input, 'r', encoding="utf8") as input_file,
+          open(args.output, 'wt', encoding="utf8") as output_file):
+        run_batch(graph, input_file, output_file, file_format, files, args.workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Benchmarks for loading the movie graph and for the query methods, run on a synthetic dataset created with
+data/synthetic_db.py. Every phase is timed over several runs, its peak memory is measured in a separate run with
+tracemalloc, and all results are written to a json file which can be compared against the results of an earlier run.
+
+With --filter-budget, the filtering of a synthetic dataset in the format of the full IMDb database is benchmarked
+instead, comparing db_filter.filter_movies_only against filter_movies_only_bounded with the given memory budget. Each
+of them runs in a fresh python process which only imports db_filter, whose peak resident memory (RSS) is measured
+from /proc/self/status (or with the resource module where that doesn't exist).
+
+Example:
+    python benchmark.py --actors 20000 --movies 10000 --output before.json
+    python benchmark.py --actors 20000 --movies 10000 --output after.json --compare before.json
+    python benchmark.py --actors 200000 --movies 200000 --filter-budget 16
+"""
+from __future__ import annotations
+from typing import Callable
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import datastructures
+from data import synthetic_db
+
+# The directory of this file, which the filter processes import db_filter from wherever the benchmarks are run
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Runs a filter of db_filter in a fresh process and prints its time and peak memory, see run_filter_benchmark
+_FILTER_SCRIPT = """
+import json, resource, sys, time
+from data import db_filter
+
+def peak_rss():
+    # On Linux, ru_maxrss includes the memory of the parent process before the exec, but VmHWM doesn't
+    try:
+        with open('/proc/self/status') as status:
+            return next(int(line.split()[1]) * 1024 for line in status if line.startswith('VmHWM'))
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+bounded, budget, directory, files = json.loads(sys.argv[1])
+baseline = peak_rss()
+start = time.perf_counter()
+if bounded:
+    db_filter.filter_movies_only_bounded(*files, memory_budget=budget, directory=directory, temp_dir=directory)
+else:
+    db_filter.filter_movies_only(*files)
+print(json.dumps({'seconds': time.perf_counter() - start, 'baseline_rss_bytes': baseline,
+                  'peak_rss_bytes': peak_rss()}))
+"""
+
+
+def _load(files: tuple[str, str, str, str]) -> datastructures.Graph:
+    """Load a movie graph from the given files."""
+    graph = datastructures.Graph()
+    graph.load_movie_graph(*files)
+    return graph
+
+
+def sample_pairs(graph: datastructures.Graph, num_queries: int, seed: int) -> list[tuple[str, str]]:
+    """
+    Return num_queries pairs of actor ids to run the queries on. Whenever possible the second actor is a costar of the
+    first, so that the queries actually find shared movies.
+    """
+    rng = random.Random(seed)
+    _, actors, _ = graph.to_biadjacency()
+    pairs = []
+    for actor in rng.sample(actors, min(num_queries, len(actors))):
+        costars = sorted({costar.db_id for movie in graph.get_neighbours(actor)
+                          for costar in graph.get_neighbours(movie.db_id) if costar.db_id != actor})
+        pairs.append((actor, rng.choice(costars) if costars else rng.choice(actors)))
+    return pairs
+
+
+def make_phases(files: tuple[str, str, str, str],
+                pairs: list[tuple[str, str]]) -> list[tuple[str, Callable[[dict], int]]]:
+    """
+    Return the benchmark phases as (name, function) pairs. The phases are run in order and share a state dictionary,
+    in which the first phase stores the loaded graph, just like the program loads the graph once and then queries it.
+    The query phases run their query on each of the given pairs of actors. Every function returns the number of
+    operations it performed.
+    """
+    def load_movie_graph(state: dict) -> int:
+        state['graph'] = _load(files)
+        state['pairs'] = pairs
+        return 1
+
+    def evaluate_all_actor_ratings(state: dict) -> int:
+        state['graph'].evaluate_all_actor_ratings()
+        return 1
+
+    def evaluate_collaborative_performance(state: dict) -> int:
+        for pair in state['pairs']:
+            state['graph'].evaluate_collaborative_performance(list(pair))
+        return len(state['pairs'])
+
+    def find_best_movie_together(state: dict) -> int:
+        for pair in state['pairs']:
+            state['graph'].find_best_movie_together(list(pair))
+        return len(state['pairs'])
+
+    def find_casting_team(state: dict) -> int:
+        for actor, _ in state['pairs']:
+            state['graph'].find_casting_team(actor, 5, 1)
+        return len(state['pairs'])
+
+    def costar_projection(state: dict) -> int:
+        projection = state['graph'].costar_projection()
+        for actor, _ in state['pairs']:
+            projection.find_casting_team(actor, 5, 1)
+        return len(state['pairs'])
+
+    def similarity_index(state: dict) -> int:
+        index = state['graph'].similarity_index()
+        for actor, _ in state['pairs']:
+            index.most_similar(actor)
+        return len(state['pairs'])
+
+    def find_connection(state: dict) -> int:
+        actors = [actor for actor, _ in state['pairs']]
+        for actor1, actor2 in zip(actors, actors[1:]):
+            state['graph'].find_connection(actor1, actor2)
+        return max(0, len(actors) - 1)
+
+    def to_networkx(state: dict) -> int:
+        state['graph'].to_networkx()
+        return 1
+
+    def to_sparse_networkx(state: dict) -> int:
+        state['graph'].to_sparse_networkx()
+        return 1
+
+    return [('load_movie_graph', load_movie_graph),
+            ('evaluate_all_actor_ratings', evaluate_all_actor_ratings),
+            ('evaluate_collaborative_performance', evaluate_collaborative_performance),
+            ('find_best_movie_together', find_best_movie_together),
+            ('find_casting_team', find_casting_team),
+            ('costar_projection', costar_projection),
+            ('similarity_index', similarity_index),
+            ('find_connection', find_connection),
+            ('to_networkx', to_networkx),
+            ('to_sparse_networkx', to_sparse_networkx)]
+
+
+def run_benchmarks(files: tuple[str, str, str, str], repeat: int = 3, num_queries: int = 200,
+                   seed: int = 0) -> dict[str, dict]:
+    """
+    Run all benchmark phases repeat times for timing, and once more under tracemalloc for the peak memory each phase
+    allocates on top of the memory already in use. Return a dictionary mapping each phase name to its results.
+    """
+    pairs = sample_pairs(_load(files), num_queries, seed)
+    results = {}
+    for run in range(repeat + 1):
+        measure_memory = run == repeat
+        state = {}
+        if measure_memory:
+            tracemalloc.start()
+
+        for name, phase in make_phases(files, pairs):
+            if measure_memory:
+                tracemalloc.reset_peak()
+                in_use = tracemalloc.get_traced_memory()[0]
+                phase(state)
+                results[name]['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - in_use
+            else:
+                start = time.perf_counter()
+                operations = phase(state)
+                elapsed = time.perf_counter() - start
+                results.setdefault(name, {'operations': operations, 'times': []})['times'].append(elapsed)
+
+        if measure_memory:
+            tracemalloc.stop()
+
+    for result in results.values():
+        result['best'] = min(result['times'])
+        result['median'] = statistics.median(result['times'])
+        result['per_operation'] = result['best'] / max(1, result['operations'])
+
+    return results
+
+
+def run_filter_benchmark(directory: str, num_actors: int, num_movies: int, memory_budget: int,
+                         seed: int = 0) -> dict[str, dict]:
+    """
+    Filter a synthetic IMDb dataset created in directory with filter_movies_only and with filter_movies_only_bounded
+    (using the given memory budget in bytes), each in a fresh process. Return the time and peak resident memory of
+    both, and whether the memory used by the bounded filter on top of the memory of the fresh process stayed within
+    the budget.
+    """
+    files = [os.path.abspath(file) for file in
+             synthetic_db.generate_imdb_dataset(os.path.join(directory, 'imdb'), num_actors, num_movies, seed)]
+    results = {}
+    for name, bounded in [('in_memory', False), ('bounded', True)]:
+        output = os.path.join(directory, name)
+        os.mkdir(output)
+        # filter_movies_only writes to the movies_only directory of the working directory
+        arguments = json.dumps([bounded, memory_budget, os.path.join(output, 'movies_only'), files])
+        process = subprocess.run([sys.executable, '-c', _FILTER_SCRIPT, arguments], cwd=output, check=True,
+                                 capture_output=True, text=True, env={**os.environ, 'PYTHONPATH': SOURCE_DIRECTORY})
+        results[name] = json.loads(process.stdout)
+        results[name]['used_rss_bytes'] = results[name]['peak_rss_bytes'] - results[name]['baseline_rss_bytes']
+
+    results['bounded']['memory_budget_bytes'] = memory_budget
+    results['bounded']['within_budget'] = results['bounded']['used_rss_bytes'] <= memory_budget
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]) -> list[str]:
+    """Return lines of a table comparing the best times and peak memory of results against baseline."""
+    lines = [f"{'phase':<36}{'best (s)':>12}{'baseline':>12}{'speedup':>10}{'memory':>10}"]
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        speedup = old['best'] / result['best'] if result['best'] > 0 else float('inf')
+        memory = result['peak_memory_bytes'] / max(1, old['peak_memory_bytes'])
+        lines.append(f"{name:<36}{result['best']:>12.4f}{old['best']:>12.4f}{speedup:>9.2f}x{memory:>9.2f}x")
+    return lines
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark loading and querying the movie graph.")
+    parser.add_argument('--actors', type=int, default=20000, help="number of actors in the synthetic dataset")
+    parser.add_argument('--movies', type=int, default=10000, help="number of movies in the synthetic dataset")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the dataset and the queries")
+    parser.add_argument('--repeat', type=int, default=3, help="number of timed runs per phase")
+    parser.add_argument('--queries', type=int, default=200, help="number of queries per query phase")
+    parser.add_argument('--output', default='benchmark_results.json', help="json file to write the results to")
+    parser.add_argument('--compare', default='', help="json file of an earlier run to compare against")
+    parser.add_argument('--filter-budget', type=int, default=0,
+                        help="benchmark db_filter with this memory budget in MiB instead of the graph")
+    args = parser.parse_args()
+
+    if args.filter_budget > 0:
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_filter_benchmark(directory, args.actors, args.movies, args.filter_budget * 2 ** 20,
+                                           args.seed)
+        with open(args.output, 'wt', encoding="utf8") as output:
+            json.dump({'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                                'python': platform.python_version(), 'platform': platform.platform(),
+                                'actors': args.actors, 'movies': args.movies, 'seed': args.seed,
+                                'filter_budget_mib': args.filter_budget},
+                       'filter': results}, output, indent=2)
+
+        for name, result in results.items():
+            print(f"{name:<12}{result['seconds']:>10.2f} s{result['peak_rss_bytes'] / 2 ** 20:>10.1f} MiB peak"
+                  f"{result['used_rss_bytes'] / 2 ** 20:>10.1f} MiB used")
+        print(f"bounded filter within {args.filter_budget} MiB: {results['bounded']['within_budget']}")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = synthetic_db.generate_dataset(os.path.join(directory, 'db'), args.actors, args.movies, args.seed)
+        results = run_benchmarks(files, args.repeat, args.queries, args.seed)
+
+    report = {'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                       'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'actors': args.actors, 'movies': args.movies, 'seed': args.seed,
+                       'repeat': args.repeat, 'queries': args.queries},
+              'phases': results}
+    with open(args.output, 'wt', encoding="utf8") as output:
+        json.dump(report, output, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:<36}{result['best']:>10.4f} s{result['peak_memory_bytes'] / 2 ** 20:>10.1f} MiB")
+
+    if args.compare != '':
+        with open(args.compare, 'r', encoding="utf8") as baseline:
+            print('\n'.join(compare(results, json.load(baseline)['phases'])))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,69 @@ titles.tsv) and filter them to only contain movies and their corresponding actor
 Each function will create a new, filtered file. Due to the sheer size of the original files (>4GB of plain text),
 it's probably unwise to run this on a weak system. The new files will be titles_filtered.tsv, actors_filtered.tsv,
 principals_filtered.tsv and ratings_filtered.tsv.
+
+On a weak system, use the bounded versions (filter_movies_only_bounded and filter_by_num_bounded) instead. They
+never hold a whole file or set of ids in memory: every file is sorted by id with an external merge sort, which spills
+sorted runs to temporary files on disk, and the files are then joined by merging them in order of their ids.
+
+Ids are compared as integer keys (see _encode_id) instead of strings, so the sets of ids of the in-memory filters
+and the sort keys of the bounded ones stay small.
 """
 import csv
+import heapq
 import operator
 import os
+import sys
+import tempfile
+from typing import Callable, Iterator
+
+# The default memory budget of the bounded filters, in bytes
+DEFAULT_MEMORY_BUDGET = 256 * 2 ** 20
+
+# The memory reserved for the buffers of the open files of a merge, which the runs of an external sort don't use
+MERGE_RESERVE = 2 ** 20
+
+# The estimated memory used by a row of a run on top of the size of its fields, for its place in the run and while
+# sorting it
+ROW_OVERHEAD = 64
+
+# The maximum number of runs merged at once, so the merge never holds too many files open
+MAX_MERGED_RUNS = 128
+
+# The prefixes of IMDb ids, for titles and names. This file is run on its own, so it doesn't import them from
+# datastructures, but the integer keys are the same.
+ID_PREFIXES = ('tt', 'nm')
+
+
+def _encode_id(db_id: str) -> int:
+    """
+    Returns the integer key of the given IMDb id, twice its number plus the index of its prefix in ID_PREFIXES. Like
+    datastructures.encode_id, raises a ValueError if it isn't an id with at least 7 digits and no leading zeros
+    beyond those, so that every key stands for exactly one id.
+    """
+    digits = db_id[2:]
+    if db_id[:2] not in ID_PREFIXES or not digits.isascii() or not digits.isdigit() or len(digits) < 7 or \
+            (len(digits) > 7 and digits[0] == '0'):
+        raise ValueError(f"Not an IMDb id: {db_id}")
+    return int(digits) * 2 + ID_PREFIXES.index(db_id[:2])
+
+
+def _key(db_id: str) -> int:
+    """
+    Returns the integer key of the given IMDb id (see _encode_id), or -1, which is never the key of an id, if it isn't
+    an id, like the header of a file.
+    """
+    try:
+        return _encode_id(db_id)
+    except ValueError:
+        return -1
+
+
+def _id_key(column: int) -> Callable[[list[str]], int]:
+    """
+    Returns a function which gives the integer key of the id in the given column of a row, to sort rows by.
+    """
+    return lambda row: _key(row[column])
 
 
 def filter_by_movie(read_file: str, write_file: str) -> str:
@@ -33,7 +92,7 @@ def filter_by_movie(read_file: str, write_file: str) -> str:
 def filter_ratings(read_ratings_file: str, read_movies_file: str, write_file: str) -> str:
     """
     Takes an imdb ratings tsv file and a filtered movies file and returns a ratings file which only contains the
-    rating of the movies. Returns the name of file it wrote to.
+    rating and number of votes of the movies. Returns the name of file it wrote to.
     """
     with (open(read_ratings_file, 'r', encoding="utf8") as ratings,
           open(read_movies_file, 'r', encoding="utf8") as movies,
@@ -44,11 +103,11 @@ def filter_ratings(read_ratings_file: str, read_movies_file: str, write_file: st
         movie_ids = set()
 
         for line in movie_reader:
-            movie_ids.add(line[0])
+            movie_ids.add(_key(line[0]))
 
         for line in ratings_reader:
-            if line[0] in movie_ids:
-                line_truncated = [line[0], line[1]]
+            if _key(line[0]) in movie_ids:
+                line_truncated = [line[0], line[1], line[2]]
                 writer.writerow(line_truncated)
 
         ratings.close()
@@ -70,10 +129,10 @@ def filter_principals(read_principals_file: str, read_movies_file: str, write_pr
         movies_set = set()
 
         for line in movie_reader:
-            movies_set.add(line[0])
+            movies_set.add(_key(line[0]))
 
         for line in principals_reader:
-            if line[0] in movies_set and (line[3] == 'actor' or line[3] == 'actress'):
+            if _key(line[0]) in movies_set and (line[3] == 'actor' or line[3] == 'actress'):
                 principals_writer.writerow([line[0], line[2]])
 
         principals.close()
@@ -97,10 +156,10 @@ def filter_actors(read_actors_file: str, read_principals_file: str, write_actors
         actors_set = set()
 
         for line in principals_reader:
-            actors_set.add(line[1])
+            actors_set.add(_key(line[1]))
 
         for line in actors_reader:
-            if line[0] in actors_set:
+            if _key(line[0]) in actors_set:
                 actor_writer.writerow([line[0], line[1], line[2], line[3]])
 
         actors.close()
@@ -111,10 +170,10 @@ def filter_actors(read_actors_file: str, read_principals_file: str, write_actors
 
 
 def filter_ratings_10k(read_ratings_file: str, read_movies_file: str,
-                       write_ratings_file: str) -> set[str]:
+                       write_ratings_file: str) -> set[int]:
     """
     Given a movies tsv file, and a ratings file, create two filtered files which only contains the top
-    10 000 movies by rating. Return the set of top 10k movies. Also filter out all
+    10 000 movies by rating. Return the set of the integer keys of the top 10k movies. Also filter out all
     adult movies, to keep this project family friendly.
     """
     top_movies = []
@@ -129,15 +188,15 @@ def filter_ratings_10k(read_ratings_file: str, read_movies_file: str,
 
         for line in movie_reader:
             if line[1] == "movie" and int(line[4]) == 0:
-                top_movies_set.add(line[0])
+                top_movies_set.add(_key(line[0]))
 
         for line in ratings_reader:
-            if line[0] in top_movies_set and int(line[2]) > 100:
-                top_movies.append([line[0], line[1]])
+            if _key(line[0]) in top_movies_set and int(line[2]) > 100:
+                top_movies.append([line[0], line[1], line[2]])
 
         top_movies.sort(key=operator.itemgetter(1), reverse=True)
         top_movies = top_movies[:10000]
-        top_movies_set = {title[0] for title in top_movies}
+        top_movies_set = {_key(title[0]) for title in top_movies}
 
         for movie in top_movies:
             ratings_writer.writerow(movie)
@@ -149,10 +208,10 @@ def filter_ratings_10k(read_ratings_file: str, read_movies_file: str,
 
 
 def filter_ratings_by_amount(read_ratings_file: str, read_movies_file: str,
-                             write_ratings_file: str, amount: int) -> set[str]:
+                             write_ratings_file: str, amount: int) -> set[int]:
     """
     Given a movies tsv file, and a ratings file, create two filtered files which only contains the top
-    <amount> movies by rating. Return the set of top <amount> movies. Also filter out all
+    <amount> movies by rating. Return the set of the integer keys of the top <amount> movies. Also filter out all
     adult movies, to keep this project family friendly.
     """
     top_movies = []
@@ -167,15 +226,15 @@ def filter_ratings_by_amount(read_ratings_file: str, read_movies_file: str,
 
         for line in movie_reader:
             if line[1] == "movie" and int(line[4]) == 0:
-                top_movies_set.add(line[0])
+                top_movies_set.add(_key(line[0]))
 
         for line in ratings_reader:
-            if line[0] in top_movies_set and int(line[2]) > 100:
-                top_movies.append([line[0], line[1]])
+            if _key(line[0]) in top_movies_set and int(line[2]) > 100:
+                top_movies.append([line[0], line[1], line[2]])
 
         top_movies.sort(key=operator.itemgetter(1), reverse=True)
         top_movies = top_movies[:amount]
-        top_movies_set = {title[0] for title in top_movies}
+        top_movies_set = {_key(title[0]) for title in top_movies}
 
         for movie in top_movies:
             ratings_writer.writerow(movie)
@@ -186,10 +245,10 @@ def filter_ratings_by_amount(read_ratings_file: str, read_movies_file: str,
     return top_movies_set
 
 
-def filter_movies_by_set(movies_set: set[str], read_movies_file: str, write_movies_file: str) -> None:
+def filter_movies_by_set(movies_set: set[int], read_movies_file: str, write_movies_file: str) -> None:
     """
-    Given a titles tsv file and a set of movie ids, create a file at specificied location with only the movies
-    corresponding to the movie ids.
+    Given a titles tsv file and a set of integer keys of movie ids (see _encode_id), create a file at specificied
+    location with only the movies corresponding to the movie ids.
     """
     with (open(read_movies_file, 'r', encoding="utf8") as movies,
          open(write_movies_file, 'wt', encoding="utf8", newline='') as write_movies):
@@ -197,13 +256,179 @@ def filter_movies_by_set(movies_set: set[str], read_movies_file: str, write_movi
         movie_writer = csv.writer(write_movies, delimiter='\t')
 
         for line in movie_reader:
-            if line[0] in movies_set:
+            if _key(line[0]) in movies_set:
                 movie_writer.writerow([line[0], line[2], line[5], line[7], line[8]])
 
         movies.close()
         write_movies.close()
 
 
+def _row_size(row: list[str]) -> int:
+    """
+    Returns an estimate of the memory used by the given row while it is held in a run.
+    """
+    return sys.getsizeof(row) + sum(sys.getsizeof(field) for field in row) + ROW_OVERHEAD
+
+
+def _spill(rows: list[list[str]], column: int, temp_dir: str) -> str:
+    """
+    Sorts the given rows by the id in the given column, writes them to a new temporary file in temp_dir and returns
+    its name.
+    """
+    rows.sort(key=_id_key(column))
+    descriptor, run_file = tempfile.mkstemp(suffix='.tsv', dir=temp_dir)
+    with open(descriptor, 'wt', encoding="utf8", newline='') as run:
+        csv.writer(run, delimiter='\t').writerows(rows)
+    return run_file
+
+
+def _merge_runs(run_files: list[str], column: int) -> Iterator[list[str]]:
+    """
+    Yields the rows of the given sorted run files, merged in order of the ids in the given column. The run files are
+    deleted once they are merged (unless their directory was removed first, if the merge was stopped early).
+    """
+    runs = [open(run_file, 'r', encoding="utf8", newline='') for run_file in run_files]
+    try:
+        yield from heapq.merge(*[csv.reader(run, delimiter='\t') for run in runs], key=_id_key(column))
+    finally:
+        for run, run_file in zip(runs, run_files):
+            run.close()
+            if os.path.exists(run_file):
+                os.remove(run_file)
+
+
+def external_sort(rows: Iterator[list[str]], column: int, memory_budget: int, temp_dir: str) -> Iterator[list[str]]:
+    """
+    Yields the given rows sorted by the id in the given column (see _id_key), holding at most about half of
+    memory_budget bytes (minus MERGE_RESERVE) of rows in memory at a time. The rows are split into runs of that size,
+    which are sorted and spilled to temporary files in temp_dir, and the runs are then merged (in several passes if
+    there are more than MAX_MERGED_RUNS of them).
+    """
+    run_budget = max(memory_budget - MERGE_RESERVE, MERGE_RESERVE) // 2
+    run_files = []
+    run = []
+    run_size = 0
+    for row in rows:
+        run.append(row)
+        run_size += _row_size(row)
+        if run_size >= run_budget:
+            run_files.append(_spill(run, column, temp_dir))
+            run = []
+            run_size = 0
+
+    if run_files == []:
+        run.sort(key=_id_key(column))
+        yield from run
+        return
+
+    if run != []:
+        run_files.append(_spill(run, column, temp_dir))
+    del run
+
+    while len(run_files) > MAX_MERGED_RUNS:
+        descriptor, merged_file = tempfile.mkstemp(suffix='.tsv', dir=temp_dir)
+        with open(descriptor, 'wt', encoding="utf8", newline='') as merged:
+            csv.writer(merged, delimiter='\t').writerows(_merge_runs(run_files[:MAX_MERGED_RUNS], column))
+        run_files = run_files[MAX_MERGED_RUNS:] + [merged_file]
+
+    yield from _merge_runs(run_files, column)
+
+
+def merge_join(rows: Iterator[list[str]], column: int, ids: Iterator[int]) -> Iterator[list[str]]:
+    """
+    Yields the rows whose id in the given column has one of the given integer keys. Both the rows and the keys have to
+    be sorted in ascending order of the keys, and may contain duplicates.
+    """
+    current = next(ids, None)
+    for row in rows:
+        key = _key(row[column])
+        while current is not None and current < key:
+            current = next(ids, None)
+        if current is None:
+            break
+        if current == key:
+            yield row
+
+
+def filter_movies_only_bounded(movies_file: str, ratings_file: str, principals_file: str, actors_file: str,
+                               memory_budget: int = DEFAULT_MEMORY_BUDGET, directory: str = 'movies_only',
+                               temp_dir: str | None = None) -> None:
+    """
+    Creates the same filtered files as filter_movies_only in the given directory, using at most about memory_budget
+    bytes of memory. The rows of the files are sorted by id. Temporary files are created in temp_dir, or in the
+    default temporary directory if it is None.
+    """
+    if not os.path.exists(directory):
+        os.mkdir(directory)
+    titles_file = os.path.join(directory, 'titles_filtered.tsv')
+    filtered_principals_file = os.path.join(directory, 'principals_filtered.tsv')
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as spill_dir:
+        with (open(movies_file, 'r', encoding="utf8") as titles,
+              open(titles_file, 'wt', encoding="utf8", newline='') as movies):
+            movies_rows = ([line[0], line[2], line[5], line[7], line[8]]
+                           for line in csv.reader(titles, delimiter="\t")
+                           if line[1] == "movie" and int(line[4]) == 0)
+            csv.writer(movies, delimiter="\t").writerows(external_sort(movies_rows, 0, memory_budget, spill_dir))
+
+        with (open(ratings_file, 'r', encoding="utf8") as ratings,
+              open(titles_file, 'r', encoding="utf8") as movies,
+              open(os.path.join(directory, 'ratings_filtered.tsv'), 'wt', encoding="utf8", newline='') as write):
+            ratings_rows = ([line[0], line[1], line[2]] for line in csv.reader(ratings, delimiter='\t'))
+            movie_ids = (_key(line[0]) for line in csv.reader(movies, delimiter='\t'))
+            csv.writer(write, delimiter='\t').writerows(
+                merge_join(external_sort(ratings_rows, 0, memory_budget, spill_dir), 0, movie_ids))
+
+        with (open(principals_file, 'r', encoding="utf8") as principals,
+              open(titles_file, 'r', encoding="utf8") as movies,
+              open(filtered_principals_file, 'wt', encoding="utf8", newline='') as write):
+            principals_rows = ([line[0], line[2]] for line in csv.reader(principals, delimiter='\t')
+                               if line[3] == 'actor' or line[3] == 'actress')
+            movie_ids = (_key(line[0]) for line in csv.reader(movies, delimiter='\t'))
+            csv.writer(write, delimiter='\t').writerows(
+                merge_join(external_sort(principals_rows, 0, memory_budget, spill_dir), 0, movie_ids))
+
+        with (open(actors_file, 'r', encoding="utf8") as actors,
+              open(filtered_principals_file, 'r', encoding="utf8") as principals,
+              open(os.path.join(directory, 'actors_filtered.tsv'), 'wt', encoding="utf8", newline='') as write):
+            actors_rows = ([line[0], line[1], line[2], line[3]] for line in csv.reader(actors, delimiter='\t'))
+            principals_rows = csv.reader(principals, delimiter='\t')
+            actor_ids = (_key(line[1]) for line in external_sort(principals_rows, 1, memory_budget, spill_dir))
+            csv.writer(write, delimiter='\t').writerows(
+                merge_join(external_sort(actors_rows, 0, memory_budget, spill_dir), 0, actor_ids))
+
+
+def filter_by_num_bounded(movies_file: str, ratings_file: str, principals_file: str, actors_file: str, amount: int,
+                          memory_budget: int = DEFAULT_MEMORY_BUDGET, temp_dir: str | None = None) -> None:
+    """
+    Creates the same filtered files as filter_by_num, using at most about memory_budget bytes of memory on top of
+    the <amount> top rated movies and their actors. Temporary files are created in temp_dir, or in the default
+    temporary directory if it is None.
+    """
+    if not os.path.exists(f'db_{amount}_movies'):
+        os.mkdir(f'db_{amount}_movies')
+
+    with (tempfile.TemporaryDirectory(dir=temp_dir) as spill_dir,
+          open(movies_file, 'r', encoding="utf8") as movies,
+          open(ratings_file, 'r', encoding="utf8") as ratings,
+          open(f'db_{amount}_movies/ratings.tsv', 'wt', encoding="utf8", newline='') as write_ratings):
+        ratings_reader = csv.reader(ratings, delimiter='\t')
+        next(ratings_reader)
+        movie_ids = ([line[0]] for line in csv.reader(movies, delimiter='\t')
+                     if line[1] == "movie" and int(line[4]) == 0)
+        ratings_rows = ([line[0], line[1], line[2]] for line in ratings_reader if int(line[2]) > 100)
+        movie_keys = (_key(line[0]) for line in external_sort(movie_ids, 0, memory_budget, spill_dir))
+        movie_ratings = merge_join(external_sort(ratings_rows, 0, memory_budget, spill_dir), 0, movie_keys)
+
+        top_movies = heapq.nlargest(amount, movie_ratings, key=operator.itemgetter(1))
+        csv.writer(write_ratings, delimiter='\t').writerows(top_movies)
+
+    movies_set = {_key(title[0]) for title in top_movies}
+    filter_movies_by_set(movies_set, movies_file, f'db_{amount}_movies/titles.tsv')
+    filter_principals(principals_file, f'db_{amount}_movies/titles.tsv', f'db_{amount}_movies/principals.tsv')
+    filter_actors(actors_file, f'db_{amount}_movies/principals.tsv', f'db_{amount}_movies/actors.tsv')
+
+
 def filter_movies_only(movies_file: str, ratings_file: str, principals_file: str, actors_file: str) -> None:
     """
     Creates filtered versions of all files, containing only movies.
@@ -248,7 +473,7 @@ if __name__ == "__main__":
     #     "forbidden-io-functions": ["print"],
     #     'max-line-length': 120,
     #     'disable': ['E1136', 'W0221'],
-    #     'extra-imports': ['csv', 'operator', 'os'],
+    #     'extra-imports': ['csv', 'heapq', 'operator', 'os', 'sys', 'tempfile', 'typing'],
     #     'max-nested-blocks': 4
     # })
     filter_movies_only('full_db/titles.tsv', 'full_db/ratings.tsv',
@@ -0,0 +1,154 @@
+"""
+Generates synthetic datasets in the same format as the filtered files created by db_filter.py (actors, titles,
+ratings and principals), so the program and the benchmarks can be run without downloading the IMDb database.
+
+Cast sizes and the number of movies per actor follow power laws, like in the real data: most movies have a few
+credited actors and most actors only play in a handful of movies, while a few actors play in very many.
+
+generate_imdb_dataset creates files in the format of the full IMDb database instead, including titles which aren't
+movies and principals who aren't actors, to run db_filter.py on.
+"""
+import csv
+import os
+import random
+
+GENRES = ["Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Documentary", "Drama", "Family",
+          "Fantasy", "History", "Horror", "Music", "Musical", "Mystery", "Romance", "Sci-Fi", "Sport", "Thriller",
+          "War", "Western"]
+
+
+def generate_actors(write_file: str, num_actors: int, rng: random.Random) -> list[str]:
+    """
+    Creates an actors tsv file with num_actors actors and returns their ids.
+    """
+    actor_ids = [f"nm{i:07d}" for i in range(1, num_actors + 1)]
+    with open(write_file, 'wt', encoding="utf8", newline='') as actors:
+        actor_writer = csv.writer(actors, delimiter='\t')
+        actor_writer.writerow(["nconst", "primaryName", "birthYear", "deathYear"])
+
+        for actor_id in actor_ids:
+            birth_year = rng.randint(1900, 2005)
+            death_year = '\\N'
+            if birth_year < 1950 and rng.random() < 0.5:
+                death_year = rng.randint(birth_year + 20, 2024)
+            actor_writer.writerow([actor_id, f"Actor {actor_id[2:]}", birth_year, death_year])
+
+    return actor_ids
+
+
+def generate_movies(titles_file: str, ratings_file: str, num_movies: int, rng: random.Random) -> list[str]:
+    """
+    Creates a titles tsv file and a ratings tsv file with num_movies movies and returns their ids.
+    """
+    movie_ids = [f"tt{i:07d}" for i in range(1, num_movies + 1)]
+    with (open(titles_file, 'wt', encoding="utf8", newline='') as titles,
+          open(ratings_file, 'wt', encoding="utf8", newline='') as ratings):
+        title_writer = csv.writer(titles, delimiter='\t')
+        ratings_writer = csv.writer(ratings, delimiter='\t')
+        title_writer.writerow(["tconst", "primaryTitle", "startYear", "runtimeMinutes", "genres"])
+        ratings_writer.writerow(["tconst", "averageRating", "numVotes"])
+
+        for movie_id in movie_ids:
+            genres = ','.join(rng.sample(GENRES, rng.randint(1, 3)))
+            title_writer.writerow([movie_id, f"Movie {movie_id[2:]}", rng.randint(1920, 2024), rng.randint(70, 180),
+                                   genres])
+            rating = min(10.0, max(1.0, rng.gauss(6.5, 1.2)))
+            ratings_writer.writerow([movie_id, f"{rating:.1f}", int(100 * rng.paretovariate(1.2))])
+
+    return movie_ids
+
+
+def generate_principals(write_file: str, movie_ids: list[str], actor_ids: list[str], rng: random.Random,
+                        cast_exponent: float = 1.5, min_cast: int = 3, max_cast: int = 10) -> None:
+    """
+    Creates a principals tsv file which casts actors in the given movies. Cast sizes are drawn from a power law with
+    the given exponent, starting at min_cast and capped at max_cast (like the principals in the IMDb database), and
+    actors are picked with a popularity which also follows a power law.
+    """
+    with open(write_file, 'wt', encoding="utf8", newline='') as principals:
+        principals_writer = csv.writer(principals, delimiter='\t')
+
+        for movie_id in movie_ids:
+            cast_size = min(max_cast, len(actor_ids), int(min_cast * rng.paretovariate(cast_exponent)))
+            cast = set()
+            while len(cast) < cast_size:
+                cast.add(actor_ids[int(len(actor_ids) * rng.random() ** 3)])
+
+            for actor_id in cast:
+                principals_writer.writerow([movie_id, actor_id])
+
+
+def generate_dataset(directory: str, num_actors: int, num_movies: int, seed: int = 0,
+                     cast_exponent: float = 1.5) -> tuple[str, str, str, str]:
+    """
+    Creates a synthetic dataset in the given directory and returns the names of the actors, titles, ratings and
+    principals files (in the order Graph.load_movie_graph takes them). The same seed always creates the same dataset.
+    """
+    if not os.path.exists(directory):
+        os.mkdir(directory)
+
+    rng = random.Random(seed)
+    files = (os.path.join(directory, 'actors.tsv'), os.path.join(directory, 'titles.tsv'),
+             os.path.join(directory, 'ratings.tsv'), os.path.join(directory, 'principals.tsv'))
+    actor_ids = generate_actors(files[0], num_actors, rng)
+    movie_ids = generate_movies(files[1], files[2], num_movies, rng)
+    generate_principals(files[3], movie_ids, actor_ids, rng, cast_exponent)
+
+    return files
+
+
+def generate_imdb_dataset(directory: str, num_actors: int, num_movies: int,
+                          seed: int = 0) -> tuple[str, str, str, str]:
+    """
+    Creates a synthetic dataset in the format of the full IMDb database in the given directory and returns the names
+    of the titles, ratings, principals and names files (in the order db_filter.filter_movies_only takes them). About
+    a third of the titles aren't movies or are adult movies, and about a third of the principals aren't actors.
+    """
+    if not os.path.exists(directory):
+        os.mkdir(directory)
+
+    rng = random.Random(seed)
+    files = (os.path.join(directory, 'titles.tsv'), os.path.join(directory, 'ratings.tsv'),
+             os.path.join(directory, 'principals.tsv'), os.path.join(directory, 'names.tsv'))
+    num_people = num_actors + num_actors // 2
+    title_ids = [f"tt{i:07d}" for i in range(1, num_movies + num_movies // 2 + 1)]
+    with (open(files[0], 'wt', encoding="utf8", newline='') as titles,
+          open(files[1], 'wt', encoding="utf8", newline='') as ratings,
+          open(files[2], 'wt', encoding="utf8", newline='') as principals):
+        title_writer = csv.writer(titles, delimiter='\t')
+        ratings_writer = csv.writer(ratings, delimiter='\t')
+        principals_writer = csv.writer(principals, delimiter='\t')
+        title_writer.writerow(["tconst", "titleType", "primaryTitle", "originalTitle", "isAdult", "startYear",
+                               "endYear", "runtimeMinutes", "genres"])
+        ratings_writer.writerow(["tconst", "averageRating", "numVotes"])
+        principals_writer.writerow(["tconst", "ordering", "nconst", "category", "job", "characters"])
+
+        for title_id in title_ids:
+            title_type = rng.choice(["movie", "movie", "movie", "short", "tvSeries", "tvEpisode"])
+            genres = ','.join(rng.sample(GENRES, rng.randint(1, 3)))
+            title_writer.writerow([title_id, title_type, f"Title {title_id[2:]}", f"Title {title_id[2:]}",
+                                   int(rng.random() < 0.05), rng.randint(1920, 2024), '\\N', rng.randint(70, 180),
+                                   genres])
+            if rng.random() < 0.8:
+                rating = min(10.0, max(1.0, rng.gauss(6.5, 1.2)))
+                ratings_writer.writerow([title_id, f"{rating:.1f}", int(20 * rng.paretovariate(1.2))])
+
+            cast_size = min(10, int(3 * rng.paretovariate(1.5)))
+            people = {int(num_people * rng.random() ** 3) + 1 for _ in range(cast_size)}
+            for ordering, person in enumerate(sorted(people), 1):
+                category = rng.choice(["actor", "actress", "actor", "actress", "director", "writer"])
+                principals_writer.writerow([title_id, ordering, f"nm{person:07d}", category, '\\N', '\\N'])
+
+    with open(files[3], 'wt', encoding="utf8", newline='') as names:
+        names_writer = csv.writer(names, delimiter='\t')
+        names_writer.writerow(["nconst", "primaryName", "birthYear", "deathYear", "primaryProfession",
+                               "knownForTitles"])
+        for person in range(1, num_people + 1):
+            names_writer.writerow([f"nm{person:07d}", f"Person {person:07d}", rng.randint(1900, 2005), '\\N',
+                                   "actor", '\\N'])
+
+    return files
+
+
+if __name__ == "__main__":
+    generate_dataset('synthetic_db', 20000, 10000)
@@ -0,0 +1,80 @@
+"""
+Discovery of the datasets created by data/db_filter.py, and a cache of loaded movie graphs so that the program can
+switch between datasets without loading them again every time.
+"""
+from __future__ import annotations
+import collections
+import os
+
+import datastructures
+import queries
+
+DATA_DIRECTORY = "data"
+
+# The file name suffixes used by the functions in db_filter.py (filter_by_num, filter_10k_rated and
+# filter_movies_only) for the actors, titles, ratings and principals files of a dataset
+FILE_SUFFIXES = ["", "_10k", "_filtered"]
+FILE_NAMES = ["actors", "titles", "ratings", "principals"]
+
+
+def discover_datasets(directory: str = DATA_DIRECTORY) -> dict[str, tuple[str, str, str, str]]:
+    """
+    Return a dictionary mapping the name of every dataset in the subdirectories of the given directory to its actors,
+    titles, ratings and principals files (in the order Graph.load_movie_graph takes them). The name of a dataset is
+    the name of its directory, e.g. sample_db or db_100_movies.
+    """
+    found = {}
+    if not os.path.isdir(directory):
+        return found
+
+    for name in sorted(os.listdir(directory)):
+        for suffix in FILE_SUFFIXES:
+            files = tuple(os.path.join(directory, name, f"{file_name}{suffix}.tsv") for file_name in FILE_NAMES)
+            if all(os.path.isfile(file) for file in files):
+                found[name] = files
+                break
+
+    return found
+
+
+class GraphCache:
+    """A cache of loaded movie graphs, which evicts the least recently used graphs once their estimated memory
+    exceeds a budget. The most recently used graph is always kept, even if it exceeds the budget by itself.
+
+    Instance Attributes:
+        - max_bytes: The memory budget of the cache in bytes.
+    """
+    max_bytes: int
+    # Private Instance Attributes:
+    #     - _graphs:
+    #         Maps the files of each loaded dataset to its graph and estimated memory, least recently used first.
+    _graphs: collections.OrderedDict[tuple[str, str, str, str], tuple[datastructures.Graph, int]]
+
+    def __init__(self, max_bytes: int = 2 * 2 ** 30) -> None:
+        """Initialize an empty cache with the given memory budget."""
+        self.max_bytes = max_bytes
+        self._graphs = collections.OrderedDict()
+
+    def __contains__(self, files: tuple[str, str, str, str]) -> bool:
+        return files in self._graphs
+
+    def get(self, files: tuple[str, str, str, str]) -> datastructures.Graph:
+        """Return the graph of the dataset with the given files, loading it if it isn't cached."""
+        if files in self._graphs:
+            self._graphs.move_to_end(files)
+            graph = self._graphs[files][0]
+            # The graph may have built its matrices since it was loaded. Its estimate is cached until then, so this
+            # doesn't scan the graph on every hit.
+            self._graphs[files] = (graph, graph.estimate_memory())
+        else:
+            graph = queries.load_graph(*files)
+            self._graphs[files] = (graph, graph.estimate_memory())
+
+        while len(self._graphs) > 1 and self.memory() > self.max_bytes:
+            self._graphs.popitem(last=False)
+
+        return graph
+
+    def memory(self) -> int:
+        """Return the estimated memory of all cached graphs in bytes."""
+        return sum(size for _, size in self._graphs.values())
@@ -2,9 +2,80 @@
 Movie and Actor classes as well as a Graph datastructure (with Vertices).
 """
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Iterator, TYPE_CHECKING
+import collections
+import contextlib
 import csv
-import networkx as nx
+import functools
+import heapq
+import json
+import logging
+import time
+import tracemalloc
+import numpy as np
+
+# networkx and scipy take a while to import, so they are only imported once they are used
+if TYPE_CHECKING:
+    import networkx as nx
+    from scipy import sparse
+
+_LOGGER = logging.getLogger(__name__)
+
+# Approximate memory used per vertex (item, vertex, neighbour set and dictionary entries) and per edge (two entries
+# in neighbour sets), measured on a loaded graph with tracemalloc
+VERTEX_BYTES = 600
+EDGE_BYTES = 130
+
+# The ways actors and groups of actors can be scored by the ratings of their movies:
+#     - 'mean': the average rating of the movies.
+#     - 'votes': the average rating weighted by the number of votes of each movie, so that a few obscure movies
+#       don't outweigh many popular ones.
+#     - 'bayesian': the vote weighted average, shrunk towards the average rating of all movies as if the actors also
+#       had a movie with that rating and as many votes as the median movie. Actors with few votes are pulled towards
+#       the average, while actors with many votes keep their own average.
+SCORING_METHODS = ('mean', 'votes', 'bayesian')
+
+# All genres of the IMDb database. The genres of a movie are stored as a bitmask, in which bit i stands for GENRES[i].
+GENRES = ('Action', 'Adult', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary', 'Drama',
+          'Family', 'Fantasy', 'Film-Noir', 'Game-Show', 'History', 'Horror', 'Music', 'Musical', 'Mystery', 'News',
+          'Reality-TV', 'Romance', 'Sci-Fi', 'Short', 'Sport', 'Talk-Show', 'Thriller', 'War', 'Western')
+_GENRE_BITS = {genre: 1 << i for i, genre in enumerate(GENRES)}
+
+# The number of pairs of actors whose timelines are kept, see Graph.get_average_rating and Graph._pair_timeline
+PAIR_TIMELINE_CACHE_SIZE = 10000
+
+# The prime modulus of the MinHash hash functions, and the multiplier which combines the rows of a band into one key
+MINHASH_PRIME = 2 ** 31 - 1
+MINHASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# IMDb ids are a prefix ('tt' for titles, 'nm' for names) followed by a number of at least 7 digits. Inside the graph
+# they are stored as integer keys, twice the number plus the index of the prefix in ID_PREFIXES, and only formatted
+# back into strings where they leave the graph.
+ID_PREFIXES = ('tt', 'nm')
+_PREFIX_BITS = {prefix: bit for bit, prefix in enumerate(ID_PREFIXES)}
+
+
+def encode_id(db_id: str) -> int:
+    """Return the integer key of the given IMDb id, e.g. 205 for 'nm0000102'.
+
+    Raise a ValueError if db_id is not a 'tt' or 'nm' id in the form decode_id returns, i.e. with at least 7 digits
+    and no leading zeros beyond those.
+    """
+    bit = _PREFIX_BITS.get(db_id[:2], -1)
+    digits = db_id[2:]
+    if bit == -1 or not digits.isascii() or not digits.isdigit() or len(digits) < 7 or \
+            (len(digits) > 7 and digits[0] == '0'):
+        raise ValueError(f"Not an IMDb id: {db_id}")
+    return int(digits) * 2 + bit
+
+
+def decode_id(key: int) -> str:
+    """Return the IMDb id of the given integer key, e.g. 'nm0000102' for 205.
+
+    Preconditions:
+        - key >= 0
+    """
+    return f"{ID_PREFIXES[key & 1]}{key >> 1:07d}"
 
 
 class Actor:
@@ -13,7 +84,7 @@ class Actor:
     -1 if the person is still alive.
 
     Instance Attributes:
-        - db_id: The id of the actor/actress.
+        - key: The integer key of the id of the actor/actress, see encode_id. The id itself is db_id.
         - name: The name of the actor/actress.
         - birth_year: Year of birth of the actor/actress
         - death_year: Year of death of the actor/actress, -1 if the person is still alive
@@ -24,25 +95,30 @@ class Actor:
         - name != ''
         - 1 <= self.rating <= 10
     """
-    db_id: str
+    key: int
     name: str
     birth_year: int
     death_year: int
     rating: float
 
-    def __init__(self, db_id: str, name: str, birth_year: int, death_year: int, rating: float = 0.0) -> None:
-        """Initialize a new actor/actress with the given information.
+    def __init__(self, db_id: str | int, name: str, birth_year: int, death_year: int, rating: float = 0.0) -> None:
+        """Initialize a new actor/actress with the given information. db_id is either the id or its integer key.
 
         Preconditions:
             - item != ''
             - name != ''
         """
-        self.db_id = db_id
+        self.key = encode_id(db_id) if isinstance(db_id, str) else db_id
         self.name = name
         self.birth_year = birth_year
         self.death_year = death_year
         self.rating = rating
 
+    @property
+    def db_id(self) -> str:
+        """The id of the actor/actress."""
+        return decode_id(self.key)
+
 
 class Movie:
     r"""
@@ -51,7 +127,7 @@ class Movie:
     represents not applicable or missing info, but due to python limitations it will be represented as N in this case.
 
     Instance Attributes:
-    - db_id: The id of the movie.
+    - key: The integer key of the id of the movie, see encode_id. The id itself is db_id.
     - name: The title of the movie.
     - release_year: Year of release of the movie.
     - runtime: The runtime of the movie.
@@ -59,12 +135,15 @@ class Movie:
     - director: The director of the movie.
     - writers: The writers of the movie.
     - rating: The rating of the movie.
+    - votes: The number of votes the rating is based on, 0 if unknown.
+    - genre_mask: The genres of the movie as a bitmask over GENRES. Genres which aren't in GENRES are left out.
 
     Representation Invariants:
     - self.db_id != ''
     - 1 <= self.rating <= 10
+    - self.votes >= 0
     """
-    db_id: str
+    key: int
     name: str
     release_year: int
     runtime: str
@@ -72,22 +151,45 @@ class Movie:
     director: str
     writers: set[str] | str
     rating: float
+    votes: int
+    genre_mask: int
 
-    def __init__(self, db_id: str, name: str, release_year: int, runtime: str,
-                 genre: str, director: str = "", writers: set[str] | str = "", rating: float = 0) -> None:
-        """Initialize a new movie with the given information.
+    def __init__(self, db_id: str | int, name: str, release_year: int, runtime: str,
+                 genre: str, director: str = "", writers: set[str] | str = "", rating: float = 0,
+                 votes: int = 0) -> None:
+        """Initialize a new movie with the given information. db_id is either the id or its integer key.
 
         Preconditions:
             - item != ''
         """
-        self.db_id = db_id
+        self.key = encode_id(db_id) if isinstance(db_id, str) else db_id
         self.name = name
         self.release_year = release_year
         self.runtime = runtime
         self.genre = genre
+        self.genre_mask = genre_mask(genre)
         self.director = director
         self.writers = writers
         self.rating = rating
+        self.votes = votes
+
+    @property
+    def db_id(self) -> str:
+        """The id of the movie."""
+        return decode_id(self.key)
+
+
+def genre_mask(genres: str) -> int:
+    """Return the bitmask of the given comma separated genres, ignoring the ones which aren't in GENRES."""
+    mask = 0
+    for genre in genres.split(','):
+        mask |= _GENRE_BITS.get(genre, 0)
+    return mask
+
+
+def genre_names(mask: int) -> list[str]:
+    """Return the genres in the given bitmask, in the order of GENRES."""
+    return [genre for genre, bit in _GENRE_BITS.items() if mask & bit]
 
 
 class _Vertex:
@@ -122,23 +224,245 @@ class _Vertex:
         return len(self.neighbours)
 
 
+class _Stats:
+    """Instrumentation of a graph, recording the wall time, rows processed and peak memory of every phase (loading
+    steps and queries) as well as counters of the work done by the queries.
+
+    Instance Attributes:
+        - phases: Maps the name of each phase to its totals over all calls.
+        - counters: Maps the name of each counter to its total.
+        - log: Whether every phase is also logged as a json record.
+        - memory: Whether the peak memory of every phase is traced with tracemalloc.
+    """
+    phases: dict[str, dict[str, Any]]
+    counters: dict[str, int]
+    log: bool
+    memory: bool
+    # Private Instance Attributes:
+    #     - _active:
+    #         The records of the phases which are currently running, innermost last.
+    _active: list[dict[str, Any]]
+
+    def __init__(self, log: bool = False, memory: bool = False) -> None:
+        """Initialize empty statistics."""
+        self.phases = {}
+        self.counters = {}
+        self.log = log
+        self.memory = memory
+        self._active = []
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[dict[str, Any]]:
+        """Measure the phase with the given name while the context is active.
+
+        Memory is only traced for the outermost phase, since tracemalloc only has a single peak.
+        """
+        record = {'phase': name, 'rows': 0, 'skipped': 0}
+        trace = self.memory and not self._active
+        in_use = 0
+        if trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            in_use = tracemalloc.get_traced_memory()[0]
+
+        self._active.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self._active.pop()
+            if trace:
+                record['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - in_use
+
+            totals = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0, 'skipped': 0})
+            totals['calls'] += 1
+            for key, value in record.items():
+                if key == 'peak_memory_bytes':
+                    totals[key] = max(totals.get(key, 0), value)
+                elif key != 'phase':
+                    totals[key] = totals.get(key, 0) + value
+
+            if self.log:
+                _LOGGER.info(json.dumps(record))
+
+    def is_measuring(self) -> bool:
+        """Return whether a phase is currently being measured."""
+        return self._active != []
+
+    def add_rows(self, rows: int, skipped: int = 0) -> None:
+        """Add the given number of processed and skipped rows to the innermost running phase."""
+        if self._active:
+            self._active[-1]['rows'] += rows
+            self._active[-1]['skipped'] += skipped
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add amount to the counter with the given name, for the total as well as for the innermost running phase."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self._active:
+            self._active[-1][name] = self._active[-1].get(name, 0) + amount
+
+
+def _measured(method: Callable) -> Callable:
+    """Decorator for Graph methods which records every call as a phase if instrumentation is enabled.
+
+    Only the outermost call is recorded: calls made while another phase is measured (like the calls of
+    evaluate_collaborative_performance by find_casting_team) count towards that phase, so no work is counted twice.
+    """
+    @functools.wraps(method)
+    def wrapper(self: Graph, *args: Any, **kwargs: Any) -> Any:
+        if self._stats is None or self._stats.is_measuring():
+            return method(self, *args, **kwargs)
+        with self._stats.measure(method.__name__.lstrip('_')):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class Graph:
     """A graph used to represent a book review network.
     """
     # Private Instance Attributes:
     #     - _vertices:
     #         A collection of the vertices contained in this graph.
-    #         Maps item to _Vertex object.
-    _vertices: dict[Any, _Vertex]
-    _names_to_ids: dict[str, str]
+    #         Maps the integer key of the id of each item (see encode_id) to its _Vertex object.
+    #     - _names_to_ids:
+    #         Maps the name of every actor and movie to the integer key of its id.
+    #     - _actor_keys:
+    #         The keys of all actors, in the order of the rows of the biadjacency matrix.
+    #     - _movie_keys:
+    #         The keys of all movies, in the order of the columns of the biadjacency matrix.
+    #     - _actor_index:
+    #         Maps actor key to its row in the biadjacency matrix.
+    #     - _movie_index:
+    #         Maps movie key to its column in the biadjacency matrix.
+    #     - _biadjacency:
+    #         The cached actor x movie biadjacency matrix, or None if it has to be rebuilt.
+    #     - _adjacency:
+    #         The cached adjacency matrix over all vertices (actors first, then movies), or None if it has to be
+    #         rebuilt.
+    #     - _stats:
+    #         The instrumentation of this graph, or None if it is disabled.
+    #     - _prior:
+    #         The cached result of scoring_prior, or None if it has to be recomputed.
+    #     - _genre_movies:
+    #         Maps every genre to the set of its movie vertices.
+    #     - _genre_aggregates:
+    #         The cached result of genre_aggregates, or None if it has to be recomputed.
+    #     - _timelines:
+    #         The release years of the movies of every actor in the order of the biadjacency matrix, sorted by year
+    #         within each actor, and their ratings in the same order, or None if they have to be recomputed.
+    #     - _pair_timelines:
+    #         Maps recently queried pairs of actors to the sorted release years and prefix sums of the ratings of
+    #         their shared movies, least recently queried first.
+    #     - _memory:
+    #         The cached result of estimate_memory, or None if the graph or its matrices changed since it was computed.
+    _vertices: dict[int, _Vertex]
+    _names_to_ids: dict[str, int]
+    _actor_keys: np.ndarray
+    _movie_keys: np.ndarray
+    _actor_index: dict[int, int]
+    _movie_index: dict[int, int]
+    _biadjacency: sparse.csr_array | None
+    _adjacency: sparse.csr_array | None
+    _stats: _Stats | None
+    _prior: tuple[float, float] | None
+    _genre_movies: dict[str, set[_Vertex]]
+    _genre_aggregates: tuple[sparse.csr_array, sparse.csr_array] | None
+    _timelines: tuple[np.ndarray, np.ndarray] | None
+    _pair_timelines: collections.OrderedDict[tuple[int, int], tuple[np.ndarray, np.ndarray]]
+    _memory: int | None
 
     def __init__(self) -> None:
         """Initialize an empty graph (no vertices or edges)."""
         self._vertices = {}
         self._names_to_ids = {}
+        self._actor_keys = np.zeros(0, dtype=np.int64)
+        self._movie_keys = np.zeros(0, dtype=np.int64)
+        self._actor_index = {}
+        self._movie_index = {}
+        self._biadjacency = None
+        self._adjacency = None
+        self._stats = None
+        self._prior = None
+        self._genre_movies = {genre: set() for genre in GENRES}
+        self._genre_aggregates = None
+        self._timelines = None
+        self._pair_timelines = collections.OrderedDict()
+        self._memory = None
+
+    def enable_stats(self, log: bool = False, memory: bool = False) -> None:
+        """Start recording instrumentation for this graph, which is returned by get_stats. Any earlier recordings are
+        discarded.
+
+        Every loading step and every query is recorded as a phase, with its number of calls, total wall time and the
+        rows it processed and skipped. Queries also count their work (intersections, candidates scanned, vertices
+        visited). If log is True, every phase is logged as a json record to the logger of this module. If memory is
+        True, the peak memory of every phase is traced with tracemalloc, which slows everything down considerably.
+        """
+        self._stats = _Stats(log, memory)
+
+    def disable_stats(self) -> None:
+        """Stop recording instrumentation for this graph."""
+        self._stats = None
+
+    def get_stats(self) -> dict[str, dict]:
+        """Return the instrumentation recorded since enable_stats was called, as a dictionary with the totals of each
+        phase under 'phases' and the totals of the counters under 'counters'.
+
+        Raise a ValueError if instrumentation is not enabled.
+        """
+        if self._stats is None:
+            raise ValueError
+        else:
+            return {'phases': {name: dict(totals) for name, totals in self._stats.phases.items()},
+                    'counters': dict(self._stats.counters)}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Add amount to the counter with the given name, if instrumentation is enabled."""
+        if self._stats is not None:
+            self._stats.count(name, amount)
+
+    def estimate_memory(self) -> int:
+        """Return a rough estimate of the memory used by this graph in bytes, based on its number of vertices and
+        edges and on the size of its cached matrices.
+
+        The estimate is cached until the graph is modified or its matrices are built, so repeated calls are cheap.
+        """
+        if self._memory is None:
+            num_edges = sum(len(v.neighbours) for v in self._vertices.values()) // 2
+            self._memory = len(self._vertices) * VERTEX_BYTES + num_edges * EDGE_BYTES
+            for matrix in (self._biadjacency, self._adjacency):
+                if matrix is not None:
+                    self._memory += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        return self._memory
 
     def __contains__(self, item: Any) -> bool:
-        return item in self._vertices
+        return self._key(item) in self._vertices
+
+    def _key(self, db_id: str | int) -> int:
+        """Return the integer key of the given id, which may already be a key. Return -1, which is never the key of a
+        vertex, if db_id is not an id.
+
+        Ids are only checked to be in the canonical form of encode_id where files are read. Lookups just parse the
+        number after the prefix, since they are much more frequent, so e.g. 'nm102' finds the vertex of 'nm0000102'.
+        """
+        if isinstance(db_id, str):
+            try:
+                return int(db_id[2:]) * 2 + _PREFIX_BITS[db_id[:2]]
+            except (KeyError, ValueError):
+                return -1
+        return db_id
+
+    def _clear_caches(self) -> None:
+        """Clear the matrices of this graph and everything computed from them, after its vertices or edges changed."""
+        self._biadjacency = None
+        self._adjacency = None
+        self._genre_aggregates = None
+        self._timelines = None
+        self._pair_timelines.clear()
+        self._memory = None
 
     def add_vertex(self, item: Any) -> None:
         """Add a vertex with the given item.
@@ -151,34 +475,70 @@ class Graph:
         Preconditions:
             - item is not None
         """
-        if item.db_id not in self._vertices:
-            self._vertices[item.db_id] = _Vertex(item)
+        if item.key not in self._vertices:
+            self._vertices[item.key] = _Vertex(item)
+            self._prior = None
+            self._clear_caches()
+            if isinstance(item, Movie):
+                for genre in genre_names(item.genre_mask):
+                    self._genre_movies[genre].add(self._vertices[item.key])
 
     def add_edge(self, item1: Any, item2: Any) -> None:
-        """Add an edge between the two vertices with the given items in this graph.
+        """Add an edge between the two vertices with the given ids (or keys) in this graph.
 
         Raise a ValueError if item1 or item2 do not appear as vertices in this graph.
 
         Preconditions:
             - item1 != item2
         """
-        if item1 in self._vertices and item2 in self._vertices:
-            v1 = self._vertices[item1]
-            v2 = self._vertices[item2]
+        key1, key2 = self._key(item1), self._key(item2)
+        if key1 in self._vertices and key2 in self._vertices:
+            v1 = self._vertices[key1]
+            v2 = self._vertices[key2]
 
             v1.neighbours.add(v2)
             v2.neighbours.add(v1)
+            self._clear_caches()
         else:
             raise ValueError
 
+    def _neighbours(self, v: _Vertex) -> set[_Vertex]:
+        """Return the neighbouring vertices of the given vertex which are part of this graph."""
+        return v.neighbours
+
+    def _movie_vertices(self) -> list[_Vertex]:
+        """Return all movie vertices which are part of this graph."""
+        return [v for v in self._vertices.values() if isinstance(v.item, Movie)]
+
+    def _all_vertices(self) -> Iterator[_Vertex]:
+        """Return an iterator over all vertices which are part of this graph, in the order they were added."""
+        return iter(self._vertices.values())
+
+    def _movie_columns(self) -> np.ndarray:
+        """Return the sorted columns of the biadjacency matrix of the movies which are part of this graph."""
+        _, _, movie_keys = self._get_biadjacency()
+        return np.arange(len(movie_keys))
+
+    def _actor_movies(self, actor: str, genre: str = '') -> set[_Vertex]:
+        """Return the movie vertices of the given actor which are part of this graph. If genre != '', only return the
+        movies of that genre, which only looks at the movies of the actor, not at all movies of the genre.
+
+        Preconditions:
+            - genre == '' or genre in GENRES
+        """
+        movies = self._neighbours(self._vertices[self._key(actor)])
+        if genre != '':
+            movies = movies & self._genre_movies[genre]
+        return movies
+
     def adjacent(self, item1: Any, item2: Any) -> bool:
         """Return whether item1 and item2 are adjacent vertices in this graph.
 
         Return False if item1 or item2 do not appear as vertices in this graph.
         """
-        if item1 in self._vertices and item2 in self._vertices:
-            v1 = self._vertices[item1]
-            return any(v2.item == item2 for v2 in v1.neighbours)
+        key1, key2 = self._key(item1), self._key(item2)
+        if key1 in self._vertices and key2 in self._vertices:
+            return self._vertices[key2] in self._neighbours(self._vertices[key1])
         else:
             return False
 
@@ -189,9 +549,10 @@ class Graph:
 
         Raise a ValueError if item does not appear as a vertex in this graph.
         """
-        if item in self._vertices:
-            v = self._vertices[item]
-            return {neighbour.item for neighbour in v.neighbours}
+        key = self._key(item)
+        if key in self._vertices:
+            v = self._vertices[key]
+            return {neighbour.item for neighbour in self._neighbours(v)}
         else:
             raise ValueError
 
@@ -205,9 +566,9 @@ class Graph:
         """
 
         if kind != '':
-            return {v.item for v in self._vertices.values() if type(v) == kind}
+            return {v.item for v in self._vertices.values() if type(v.item) == kind}
         else:
-            return set(self._vertices.keys())
+            return {decode_id(key) for key in self._vertices}
 
     def get_id(self, name: str) -> str:
         """
@@ -221,7 +582,12 @@ class Graph:
         if name not in self._names_to_ids:
             raise ValueError
         else:
-            return self._names_to_ids[name]
+            return decode_id(self._names_to_ids[name])
+
+    def is_actor(self, db_id: str | int) -> bool:
+        """Return whether the given id (or key) is an actor in this graph."""
+        key = self._key(db_id)
+        return key in self._vertices and isinstance(self._vertices[key].item, Actor)
 
     def get_name(self, id_code: str) -> str:
         """
@@ -229,65 +595,148 @@ class Graph:
         the database.
 
         """
-        if id_code not in self._vertices:
+        key = self._key(id_code)
+        if key not in self._vertices:
             raise ValueError
         else:
-            return self._vertices[id_code].item.name
+            return self._vertices[key].item.name
 
-    def evaluate_all_actor_ratings(self) -> None:
+    @_measured
+    def filter_view(self, min_rating: float = 0, min_year: int = -1, max_year: int = -1,
+                    genre: str = '') -> GraphView:
+        """
+        Return a view of this graph which only contains the movies with a rating of at least min_rating, released
+        between min_year and max_year (inclusive) and with the given genre. A year of -1 and a genre of '' mean
+        that there is no restriction. A genre which isn't in GENRES gives an empty view.
+
+        The view shares its vertices with this graph, so creating it doesn't copy any actors or movies. With a genre,
+        only the movies of that genre are looked at.
+        """
+        if genre == '':
+            candidates = self._movie_vertices()
+        else:
+            candidates = self._genre_movies.get(genre, set())
+        movies = {v for v in candidates
+                  if v.item.rating >= min_rating
+                  and (min_year == -1 or v.item.release_year >= min_year)
+                  and (max_year == -1 or v.item.release_year <= max_year)}
+        return GraphView(self, movies)
+
+    def scoring_prior(self) -> tuple[float, float]:
         """
-        initiate all the actors' rating by taking the average of the ratings of the movies they are adjacent to.
+        Return the prior used by the 'bayesian' scoring method: the vote weighted average rating of all movies, and
+        the number of votes of the median movie, which is how much weight the prior gets.
         """
-        vertices = self.get_all_vertices()
+        if self._prior is None:
+            movies = self._movie_vertices()
+            if movies == []:
+                self._prior = (0.0, 1.0)
+            else:
+                ratings = np.array([v.item.rating for v in movies])
+                weights = _scoring_weights(np.array([v.item.votes for v in movies]), 'votes')
+                self._prior = (float(np.average(ratings, weights=weights)), float(np.median(weights)))
+
+        return self._prior
+
+    def score_actors(self, method: str = 'mean') -> dict[str, float]:
+        """
+        Return a dictionary mapping the id of every actor to their score, computed from the ratings of the movies
+        they played in with the given scoring method (see SCORING_METHODS). Actors without movies get a score of 0.
 
-        for vertex in vertices:
-            if type(self._vertices[vertex].item) == Actor:
-                sum_score = 0
-                for neighbour in self._vertices[vertex].neighbours:
-                    sum_score += neighbour.item.rating
+        All actors are scored at once with two sparse matrix-vector products.
 
-                if len(self._vertices[vertex].neighbours) != 0:
-                    self._vertices[vertex].item.rating = sum_score / len(self._vertices[vertex].neighbours)
-                else:
-                    self._vertices[vertex].item.rating = 0
+        Raise a ValueError if method is not one of SCORING_METHODS.
+        """
+        _, actor_keys, _ = self._get_biadjacency()
+        return {decode_id(key): score for key, score in zip(actor_keys.tolist(), self._actor_scores(method).tolist())}
+
+    def _actor_scores(self, method: str) -> np.ndarray:
+        """Return the scores of all actors in the row order of the biadjacency matrix. See score_actors."""
+        matrix, actor_keys, _ = self._get_biadjacency()
+        weights = _scoring_weights(self.movie_votes(), method)
+        weighted_sums = matrix @ (weights * self.movie_ratings())
+        weight_sums = matrix @ weights
+
+        scores = np.zeros(len(actor_keys))
+        has_movies = np.diff(matrix.indptr) > 0
+        scores[has_movies] = _combine_scores(weighted_sums[has_movies], weight_sums[has_movies], method,
+                                             self.scoring_prior())
+        return scores
+
+    @_measured
+    def evaluate_all_actor_ratings(self, method: str = 'mean') -> None:
+        """
+        initiate all the actors' rating by scoring the ratings of the movies they are adjacent to with the given
+        scoring method (see SCORING_METHODS). By default, this is the average of the ratings.
 
-    def evaluate_collaborative_performance(self, actors: list[str]) -> float:
+        Raise a ValueError if method is not one of SCORING_METHODS.
+        """
+        _, actor_keys, _ = self._get_biadjacency()
+        for key, score in zip(actor_keys.tolist(), self._actor_scores(method).tolist()):
+            self._vertices[key].item.rating = score
+
+    def _score_movies(self, movies: set[_Vertex], method: str) -> float:
+        """Return the score of the given non-empty set of movie vertices with the given scoring method.
+
+        Raise a ValueError if method is not one of SCORING_METHODS.
+        """
+        if method == 'mean':
+            score_sum = 0
+            for movie in movies:
+                score_sum += movie.item.rating
+            return score_sum / len(movies)
+
+        ratings = np.array([movie.item.rating for movie in movies])
+        weights = _scoring_weights(np.array([movie.item.votes for movie in movies]), method)
+        return float(_combine_scores(np.array([weights @ ratings]), np.array([weights.sum()]), method,
+                                     self.scoring_prior())[0])
+
+    @_measured
+    def evaluate_collaborative_performance(self, actors: list[str], method: str = 'mean', genre: str = '') -> float:
         """
         actors is a list of the ids of the actors being evaluated.
 
-        This method returns the average score of the movies that all members of the list particpated in.
+        This method returns the score of the movies that all members of the list particpated in, by default their
+        average rating. method chooses how the ratings are scored, see SCORING_METHODS. If genre != '', only the
+        movies of that genre count.
 
         If there is no movie that all members of the list participated in, return -1
 
         Preconditions:
             - actors != []
+            - method in SCORING_METHODS
+            - genre == '' or genre in GENRES
         """
 
-        all_movies = [self._vertices[actor].neighbours for actor in actors]
+        all_movies = [self._actor_movies(actor, genre) for actor in actors]
         shared_movies = all_movies[0]
         for i in range(1, len(all_movies)):
             shared_movies = shared_movies & all_movies[i]
+        self._count('intersections', len(all_movies) - 1)
 
         if len(shared_movies) == 0:
             return -1
         else:
-            score_sum = 0
-            for movie in shared_movies:
-                score_sum += movie.item.rating
-            return score_sum / len(shared_movies)
+            return self._score_movies(shared_movies, method)
 
-    def find_best_movie_together(self, actors: list[str]) -> str:
+    @_measured
+    def find_best_movie_together(self, actors: list[str], genre: str = '') -> str:
         """
         acotrs is a list of the ids of the actors being evaluated.
 
-        This method returns the id of the movie that has the highest rating that contains all actors in the list.
+        This method returns the id of the movie that has the highest rating that contains all actors in the list. If
+        genre != '', only the movies of that genre count.
 
         If there is no movie that all members of the list participated in, return /N
+
+        Preconditions:
+            - genre == '' or genre in GENRES
         """
-        all_movies = [self._vertices[actor].neighbours for actor in actors]
+        all_movies = [self._actor_movies(actor, genre) for actor in actors]
         shared_movies = all_movies[0]
         for i in range(1, len(all_movies)):
             shared_movies = shared_movies & all_movies[i]
+        self._count('intersections', len(all_movies) - 1)
 
         if len(shared_movies) == 0:
             return '/N'
@@ -301,10 +750,13 @@ class Graph:
 
             return max_id
 
-    def find_casting_team(self, actor: str, number_of_actors: int, min_num_collab) -> list[str]:
+    @_measured
+    def find_casting_team(self, actor: str, number_of_actors: int, min_num_collab, method: str = 'mean',
+                          genre: str = '') -> list[str]:
         """
         This method returns a list of actors who have collaborated with the actor variable, sorted in descending order
-        of their average collaborative performance.
+        of their collaborative performance, scored with the given method (see SCORING_METHODS). If genre != '', only
+        the movies of that genre count.
 
         actor is the id of the actor being found casting team for.
 
@@ -313,12 +765,21 @@ class Graph:
 
         min num collab refers to the minimum amount of movies two actors has to collaborated in for that actor to be
         considered
-        """
-        acted_together = acted_together = list({self.get_name(u.item.db_id) for v in self._vertices[actor].neighbours
-        for u in v.neighbours if len(u.neighbours.intersection(self._vertices[actor].neighbours)) >= min_num_collab and
-                          u.item.db_id != actor})
 
-        score_together = [self.evaluate_collaborative_performance([actor, self.get_id(u)]) for u in acted_together]
+        Preconditions:
+            - genre == '' or genre in GENRES
+        """
+        key = self._key(actor)
+        movies = self._actor_movies(key, genre)
+        acted_together = list({u.item.name for v in movies for u in v.neighbours
+                               if len(u.neighbours.intersection(movies)) >= min_num_collab and u.item.key != key})
+        if self._stats is not None:
+            candidates = sum(len(v.neighbours) for v in movies)
+            self._count('candidates_scanned', candidates)
+            self._count('intersections', candidates)
+
+        score_together = [self.evaluate_collaborative_performance([key, self._names_to_ids[u]], method, genre)
+                          for u in acted_together]
 
         for i in range(len(acted_together)):
             for z in range(i, 0, -1):
@@ -330,15 +791,17 @@ class Graph:
 
         return acted_together[:number_of_actors]
 
+    @_measured
     def _load_actors(self, names_file: str) -> None:
         """
         Helper function which takes the file name of a names.tsv file and creates all actor vertices within the given
-        graph
+        graph. Ids are encoded into integer keys as they are read.
         """
+        rows = 0
         with open(names_file, 'r', encoding="utf8") as names:
             names_reader = csv.reader(names, delimiter="\t")
             next(names_reader)
-            for line in names_reader:
+            for rows, line in enumerate(names_reader, 1):
                 death_year = -1
                 birth_year = -1
                 if line[3] != '\\N':
@@ -346,13 +809,18 @@ class Graph:
                 if line[2] != '\\N':
                     birth_year = int(line[2])
 
-                self.add_vertex(Actor(line[0], line[1], birth_year, death_year))
-                self._names_to_ids[line[1]] = line[0]
+                key = encode_id(line[0])
+                self.add_vertex(Actor(key, line[1], birth_year, death_year))
+                self._names_to_ids[line[1]] = key
+
+        if self._stats is not None:
+            self._stats.add_rows(rows)
 
+    @_measured
     def _load_movies(self, titles_file: str, ratings_file: str) -> None:
         """
         Helper function which takes the file name of a title.basics.tsv file and a title.ratings.tsv file and creates all
-        movie vertices within the given graph.
+        movie vertices within the given graph. Ids are encoded into integer keys as they are read.
         """
         with open(titles_file, 'r', encoding="utf8") as titles, open(ratings_file, 'r', encoding="utf8") as ratings:
             titles_reader = csv.reader(titles, delimiter="\t")
@@ -360,27 +828,57 @@ class Graph:
             next(titles_reader)
             next(ratings_reader)
             movies = {}
+            rows = skipped = 0
             for line in titles_reader:
+                rows += 1
                 release = 0
                 if line[2] != '\\N':
                     release = int(line[2])
-                movies[line[0]] = Movie(line[0], line[1], release, line[3], line[4])
-                self._names_to_ids[line[1]] = line[0]
+                key = encode_id(line[0])
+                movies[key] = Movie(key, line[1], release, line[3], line[4])
+                self._names_to_ids[line[1]] = key
             for line in ratings_reader:
-                if line[0] in movies:
-                    movies[line[0]].rating = float(line[1])
-                    self.add_vertex(movies[line[0]])
+                rows += 1
+                key = self._key(line[0])
+                if key in movies:
+                    movies[key].rating = float(line[1])
+                    if len(line) > 2:
+                        movies[key].votes = int(line[2])
+                    self.add_vertex(movies[key])
+                else:
+                    skipped += 1
+
+        if self._stats is not None:
+            self._stats.add_rows(rows, skipped)
 
+    @_measured
     def _load_principals(self, principal_file: str) -> None:
         """
         Helper function which takes the file name of a principal tsv file and creates the edges in the graph
-        corresponding to the principals.
+        corresponding to the principals. Rows whose ids are not in the graph, like a header, are skipped.
+
+        The edges are added to the vertices directly, so the caches of the graph are only cleared once at the end.
         """
+        vertices = self._vertices
         with open(principal_file, 'r', encoding="utf8") as principals:
             principal_reader = csv.reader(principals, delimiter='\t')
+            rows = skipped = 0
+            movie_id, movie = '', None
             for line in principal_reader:
-                if line[0] in self and line[1] in self:
-                    self.add_edge(line[0], line[1])
+                rows += 1
+                # The rows of a movie are next to each other, so its id is only encoded once
+                if line[0] != movie_id:
+                    movie_id, movie = line[0], vertices.get(self._key(line[0]))
+                actor = vertices.get(self._key(line[1]))
+                if movie is not None and actor is not None:
+                    movie.neighbours.add(actor)
+                    actor.neighbours.add(movie)
+                else:
+                    skipped += 1
+
+        self._clear_caches()
+        if self._stats is not None:
+            self._stats.add_rows(rows, skipped)
 
     def load_movie_graph(self, actors: str, titles: str, ratings: str, principals: str) -> None:
         """
@@ -400,11 +898,13 @@ class Graph:
 
         Note that this method is provided for you, and you shouldn't change it.
         """
+        import networkx as nx
+
         graph_nx = nx.Graph()
-        for v in self._vertices.values():
+        for v in self._all_vertices():
             graph_nx.add_node(v.item, kind=type(v))
 
-            for u in v.neighbours:
+            for u in self._neighbours(v):
                 if graph_nx.number_of_nodes() < max_vertices:
                     graph_nx.add_node(u.item, kind=type(u))
 
@@ -416,4 +916,892 @@ class Graph:
 
         return graph_nx
 
+    @_measured
+    def _build_index(self) -> None:
+        """
+        Helper function which assigns compact integer ids to all actors and movies and builds the actor x movie
+        biadjacency matrix from the vertices. Actor i corresponds to row i and movie j to column j.
+        """
+        from scipy import sparse
+
+        actor_keys = []
+        movie_keys = []
+        for key, v in self._vertices.items():
+            if isinstance(v.item, Actor):
+                actor_keys.append(key)
+            else:
+                movie_keys.append(key)
+
+        movie_index = {key: i for i, key in enumerate(movie_keys)}
+        indptr = np.zeros(len(actor_keys) + 1, dtype=np.int64)
+        indices = []
+        for i, key in enumerate(actor_keys):
+            indices.extend(movie_index[u.item.key] for u in self._vertices[key].neighbours)
+            indptr[i + 1] = len(indices)
+
+        matrix = sparse.csr_array((np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), indptr),
+                                  shape=(len(actor_keys), len(movie_keys)))
+        matrix.sort_indices()
+
+        self._actor_keys = np.array(actor_keys, dtype=np.int64)
+        self._movie_keys = np.array(movie_keys, dtype=np.int64)
+        self._actor_index = {key: i for i, key in enumerate(actor_keys)}
+        self._movie_index = movie_index
+        self._biadjacency = matrix
+        self._adjacency = None
+        self._memory = None
+
+    def to_biadjacency(self) -> tuple[sparse.csr_array, list[str], list[str]]:
+        """Return the actor x movie biadjacency matrix of this graph, together with the ids of the actors (rows) and
+        the ids of the movies (columns).
+
+        Entry (i, j) is 1 if actor i played in movie j. The matrix is cached until the graph is modified, so repeated
+        calls are cheap, but the lists of ids are formatted on every call. The returned matrix must not be modified.
+        """
+        matrix, actor_keys, movie_keys = self._get_biadjacency()
+        return matrix, [decode_id(key) for key in actor_keys.tolist()], [decode_id(key) for key in movie_keys.tolist()]
+
+    def _get_biadjacency(self) -> tuple[sparse.csr_array, np.ndarray, np.ndarray]:
+        """Return the biadjacency matrix of this graph like to_biadjacency, but with arrays of the integer keys of the
+        actors and movies instead of their ids. The returned matrix and arrays must not be modified.
+        """
+        if self._biadjacency is None:
+            self._build_index()
+
+        return self._biadjacency, self._actor_keys, self._movie_keys
+
+    def movie_votes(self) -> np.ndarray:
+        """Return an array of the number of votes of all movies, in the column order of the biadjacency matrix returned
+        by to_biadjacency.
+        """
+        _, _, movie_keys = self._get_biadjacency()
+        return np.array([self._vertices[movie].item.votes for movie in movie_keys.tolist()], dtype=np.float64)
+
+    def movie_years(self) -> np.ndarray:
+        """Return an array of the release years of all movies (0 if unknown), in the column order of the biadjacency
+        matrix returned by to_biadjacency.
+        """
+        _, _, movie_keys = self._get_biadjacency()
+        return np.array([self._vertices[movie].item.release_year for movie in movie_keys.tolist()], dtype=np.int32)
+
+    def movie_ratings(self) -> np.ndarray:
+        """Return an array of the ratings of all movies, in the column order of the biadjacency matrix returned by
+        to_biadjacency.
+        """
+        _, _, movie_keys = self._get_biadjacency()
+        return np.array([self._vertices[movie].item.rating for movie in movie_keys.tolist()], dtype=np.float64)
+
+    def genre_aggregates(self) -> tuple[sparse.csr_array, sparse.csr_array]:
+        """Return the number of movies of every actor in every genre and the sum of their ratings, as two actors x
+        GENRES matrices with the rows of the biadjacency matrix returned by to_biadjacency. The matrices are cached
+        until the graph is modified and must not be modified.
+        """
+        from scipy import sparse
+
+        matrix, _, movie_keys = self._get_biadjacency()
+        if self._genre_aggregates is None:
+            masks = np.array([self._vertices[movie].item.genre_mask for movie in movie_keys.tolist()], dtype=np.int64)
+            genres = sparse.csr_array(((masks[:, None] >> np.arange(len(GENRES))) & 1).astype(np.float64))
+            counts = (matrix @ genres).tocsr()
+            rating_sums = (matrix @ genres.multiply(self.movie_ratings()[:, None])).tocsr()
+            self._genre_aggregates = (counts, rating_sums)
+
+        return self._genre_aggregates
+
+    def get_genre_ratings(self, actor: str) -> dict[str, tuple[int, float]]:
+        """Return a dictionary mapping every genre the given actor played in to their number of movies of that genre
+        and the average rating of those movies.
+
+        Raise a ValueError if actor does not appear in this graph.
+        """
+        counts, rating_sums = self.genre_aggregates()
+        key = self._key(actor)
+        if not self.is_actor(key):
+            raise ValueError(f"Actor not found: {actor}")
+
+        i = self._actor_index[key]
+        count_row = counts[[i]].toarray().ravel()
+        sum_row = rating_sums[[i]].toarray().ravel()
+        return {GENRES[g]: (int(count_row[g]), float(sum_row[g] / count_row[g])) for g in np.flatnonzero(count_row)}
+
+    def _get_timelines(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the release years of the movies of all actors, sorted by year within the row of each actor of the
+        biadjacency matrix, and their ratings in the same order.
+        """
+        matrix, _, _ = self._get_biadjacency()
+        if self._timelines is None:
+            years = self.movie_years()[matrix.indices]
+            ratings = self.movie_ratings()[matrix.indices]
+            rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+            order = np.lexsort((years, rows))
+            self._timelines = (years[order], ratings[order])
+
+        return self._timelines
+
+    def _actor_entries(self, actor: str | int) -> tuple[int, int]:
+        """Return the start and end of the entries of the given actor (id or key) in the biadjacency matrix.
+
+        Raise a ValueError if actor is not an actor in this graph.
+        """
+        matrix, _, _ = self._get_biadjacency()
+        key = self._key(actor)
+        if not self.is_actor(key):
+            raise ValueError(f"Actor not found: {actor}")
+
+        i = self._actor_index[key]
+        return matrix.indptr[i], matrix.indptr[i + 1]
+
+    def _actor_timeline(self, actor: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return the sorted release years of the movies of the given actor and the prefix sums of their ratings.
+
+        The prefix sums start over for every actor, instead of being differences of one sum over the whole graph, so
+        their rounding errors don't grow with the size of the graph.
+
+        Raise a ValueError if actor is not an actor in this graph.
+        """
+        start, end = self._actor_entries(actor)
+        years, ratings = self._get_timelines()
+        return years[start:end], np.concatenate([[0.0], np.cumsum(ratings[start:end])])
+
+    def _pair_timeline(self, actor1: str, actor2: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return the sorted release years of the movies actor1 and actor2 played in together and the prefix sums of
+        their ratings. The timelines of the PAIR_TIMELINE_CACHE_SIZE most recently queried pairs are cached.
+
+        Raise a ValueError if actor1 or actor2 is not an actor in this graph.
+        """
+        start1, end1 = self._actor_entries(actor1)
+        start2, end2 = self._actor_entries(actor2)
+        key1, key2 = self._key(actor1), self._key(actor2)
+        key = (min(key1, key2), max(key1, key2))
+        if key in self._pair_timelines:
+            self._pair_timelines.move_to_end(key)
+        else:
+            matrix, _, movie_keys = self._get_biadjacency()
+            shared = np.intersect1d(matrix.indices[start1:end1], matrix.indices[start2:end2], assume_unique=True)
+            movies = [self._vertices[movie].item for movie in movie_keys[shared].tolist()]
+            years = np.array([movie.release_year for movie in movies], dtype=np.int32)
+            ratings = np.array([movie.rating for movie in movies], dtype=np.float64)
+            order = np.argsort(years, kind='stable')
+
+            if len(self._pair_timelines) >= PAIR_TIMELINE_CACHE_SIZE:
+                self._pair_timelines.popitem(last=False)
+            self._pair_timelines[key] = (years[order], np.concatenate([[0.0], np.cumsum(ratings[order])]))
+
+        return self._pair_timelines[key]
+
+    def get_average_rating(self, actors: list[str], start_year: int = -1, end_year: int = -1) -> float:
+        """
+        Return the average rating of the movies all of the given actors played in which were released between
+        start_year and end_year (inclusive), or -1 if there are none. A year of -1 means that there is no
+        restriction. Movies without a known release year are left out.
+
+        Every average is answered with two binary searches in the timeline of the actor (or pair of actors), which is
+        built the first time it is needed.
+
+        Raise a ValueError if actors are not one or two actors in this graph.
+        """
+        if len(actors) == 1:
+            years, prefix = self._actor_timeline(actors[0])
+        elif len(actors) == 2:
+            years, prefix = self._pair_timeline(actors[0], actors[1])
+        else:
+            raise ValueError(f"A timeline needs one or two actors, not {len(actors)}")
+
+        low = np.searchsorted(years, max(start_year, 1), side='left')
+        high = len(years) if end_year == -1 else np.searchsorted(years, end_year, side='right')
+        if high <= low:
+            return -1
+        return float((prefix[high] - prefix[low]) / (high - low))
+
+    def get_career_timeline(self, actors: list[str]) -> list[tuple[int, int, float]]:
+        """
+        Return the career of the given actor (or pair of actors) as a list of (year, number of movies, average
+        rating) for every year in which they released a movie (together), in ascending order of year. Movies without a
+        known release year are left out.
+
+        Raise a ValueError if actors are not one or two actors in this graph.
+        """
+        if len(actors) == 1:
+            years, prefix = self._actor_timeline(actors[0])
+        elif len(actors) == 2:
+            years, prefix = self._pair_timeline(actors[0], actors[1])
+        else:
+            raise ValueError(f"A timeline needs one or two actors, not {len(actors)}")
+
+        first = np.searchsorted(years, 1, side='left')
+        distinct, starts = np.unique(years[first:], return_index=True)
+        starts = starts + first
+        ends = np.append(starts[1:], len(years))
+        counts = ends - starts
+        averages = (prefix[ends] - prefix[starts]) / counts
+        return list(zip(distinct.tolist(), counts.tolist(), averages.tolist()))
+
+    def _get_adjacency(self) -> sparse.csr_array:
+        """Return the adjacency matrix over all vertices of this graph. Actor i is vertex i and movie j is vertex
+        len(actors) + j.
+        """
+        from scipy import sparse
 
+        matrix, _, _ = self._get_biadjacency()
+        if self._adjacency is None:
+            self._adjacency = sparse.bmat([[None, matrix], [matrix.T, None]], format='csr')
+            self._adjacency.sort_indices()
+            self._memory = None
+
+        return self._adjacency
+
+    def _vertex_number(self, actor: str) -> int:
+        """Return the number of the given actor in the adjacency matrix.
+
+        Raise a ValueError if actor is not an actor in this graph.
+        """
+        self._get_biadjacency()
+        key = self._key(actor)
+        if key not in self._actor_index:
+            raise ValueError
+
+        return self._actor_index[key]
+
+    def _vertex_id(self, vertex: int) -> str:
+        """Return the database id of the vertex with the given number in the adjacency matrix."""
+        if vertex < len(self._actor_keys):
+            return decode_id(int(self._actor_keys[vertex]))
+        else:
+            return decode_id(int(self._movie_keys[vertex - len(self._actor_keys)]))
+
+    @_measured
+    def find_connection(self, actor1: str, actor2: str) -> list[str]:
+        """
+        Return a shortest path between actor1 and actor2 as a list of ids, alternating between actors and the movies
+        connecting them and starting with actor1 and ending with actor2. The number of movies on the path are the
+        degrees of separation between the two actors.
+
+        The search runs a breadth first search from both actors at once, always expanding the smaller frontier, and
+        keeps the visited vertices in boolean arrays indexed by vertex number.
+
+        Return an empty list if the actors are not connected. Raise a ValueError if actor1 or actor2 do not appear as
+        actors in this graph.
+        """
+        adjacency = self._get_adjacency()
+        ends = (self._vertex_number(actor1), self._vertex_number(actor2))
+        if ends[0] == ends[1]:
+            return [self._vertex_id(ends[0])]
+
+        num_vertices = adjacency.shape[0]
+        visited = [np.zeros(num_vertices, dtype=bool), np.zeros(num_vertices, dtype=bool)]
+        parents = [np.full(num_vertices, -1, dtype=np.int64), np.full(num_vertices, -1, dtype=np.int64)]
+        depths = [np.full(num_vertices, -1, dtype=np.int64), np.full(num_vertices, -1, dtype=np.int64)]
+        frontiers = [np.array([ends[0]]), np.array([ends[1]])]
+        for side in (0, 1):
+            visited[side][ends[side]] = True
+            depths[side][ends[side]] = 0
+
+        while frontiers[0].size > 0 and frontiers[1].size > 0:
+            side = 0 if frontiers[0].size <= frontiers[1].size else 1
+            other = 1 - side
+            frontiers[side] = _expand_frontier(adjacency, frontiers[side], visited[side], parents[side], depths[side])
+
+            self._count('vertices_visited', frontiers[side].size)
+
+            meetings = frontiers[side][visited[other][frontiers[side]]]
+            if meetings.size > 0:
+                meeting = meetings[np.argmin(depths[other][meetings])]
+                return [self._vertex_id(v) for v in _trace_back(parents[0], meeting)[::-1]
+                        + _trace_back(parents[1], meeting)[1:]]
+
+        return []
+
+    @_measured
+    def find_best_rated_connection(self, actor1: str, actor2: str) -> list[str]:
+        """
+        Return the path between actor1 and actor2 going through the best rated movies, in the same format as
+        find_connection.
+
+        Every movie on the path costs 11 minus its rating, so the path prefers few and highly rated movies. This is
+        computed with Dijkstra's algorithm on the adjacency matrix.
+
+        Return an empty list if the actors are not connected. Raise a ValueError if actor1 or actor2 do not appear as
+        actors in this graph.
+        """
+        adjacency = self._get_adjacency()
+        source, target = self._vertex_number(actor1), self._vertex_number(actor2)
+
+        costs = np.zeros(adjacency.shape[0])
+        costs[len(self._actor_keys):] = 11 - self.movie_ratings()
+        distances = np.full(adjacency.shape[0], np.inf)
+        parents = np.full(adjacency.shape[0], -1, dtype=np.int64)
+        done = np.zeros(adjacency.shape[0], dtype=bool)
+
+        distances[source] = 0
+        queue = [(0.0, source)]
+        while queue:
+            distance, vertex = heapq.heappop(queue)
+            if done[vertex]:
+                continue
+            if vertex == target:
+                return [self._vertex_id(v) for v in _trace_back(parents, target)[::-1]]
+            done[vertex] = True
+            self._count('vertices_visited')
+
+            neighbours = adjacency.indices[adjacency.indptr[vertex]:adjacency.indptr[vertex + 1]]
+            new_distances = distance + costs[neighbours]
+            improved = new_distances < distances[neighbours]
+            neighbours, new_distances = neighbours[improved], new_distances[improved]
+            distances[neighbours] = new_distances
+            parents[neighbours] = vertex
+            for neighbour, new_distance in zip(neighbours.tolist(), new_distances.tolist()):
+                heapq.heappush(queue, (new_distance, neighbour))
+
+        return []
+
+    @_measured
+    def costar_projection(self, method: str = 'mean') -> CoStarGraph:
+        """Return the actor-actor co-star view of this graph, scoring pairs with the given method. See CoStarGraph."""
+        return CoStarGraph(self, method)
+
+    def similarity_index(self, num_perm: int = 128, bands: int = 64) -> MinHashIndex:
+        """Return an index of the actors of this graph by the similarity of their movies. See MinHashIndex."""
+        return MinHashIndex(self, num_perm, bands)
+
+    def to_sparse_networkx(self, max_vertices: int = 20000) -> nx.Graph:
+        """Convert this graph into a networkx Graph whose nodes are compact integer ids, built in bulk from the
+        biadjacency matrix.
+
+        Actors are numbered first, followed by the movies. Every node has a 'kind' attribute ('actor' or 'movie') and
+        a 'db_id' attribute with its database id.
+
+        Movies are taken in column order together with all of their actors until max_vertices would be exceeded, so
+        no movie is missing any of its actors. This is a different cut-off than to_networkx, which walks the vertices
+        in the order they were added (actors first) and may leave out some of the actors of the last movies.
+        """
+        import networkx as nx
+        from scipy import sparse
+
+        matrix, actor_keys, movie_keys = self._get_biadjacency()
+        columns = self._movie_columns()
+        matrix, movie_keys = matrix[:, columns].tocsr(), movie_keys[columns]
+        matrix.sort_indices()
+        num_actors, num_movies = matrix.shape
+
+        # The first movie (column) each actor appears in decides when that actor enters the graph
+        has_movies = np.diff(matrix.indptr) > 0
+        first_movie = np.full(num_actors, num_movies, dtype=np.int64)
+        first_movie[has_movies] = matrix.indices[matrix.indptr[:-1][has_movies]]
+        actors_entering = np.bincount(first_movie, minlength=num_movies + 1)[:-1]
+        vertices_needed = np.arange(1, num_movies + 1) + np.cumsum(actors_entering)
+        movies_kept = int(np.searchsorted(vertices_needed, max_vertices, side='right'))
+
+        actors_kept = np.flatnonzero(first_movie < movies_kept)
+        sub = matrix[actors_kept][:, :movies_kept]
+        adjacency = sparse.bmat([[None, sub], [sub.T, None]], format='csr')
+
+        graph_nx = nx.from_scipy_sparse_array(adjacency)
+        kinds = ['actor'] * len(actors_kept) + ['movie'] * movies_kept
+        db_ids = [decode_id(key) for key in actor_keys[actors_kept].tolist() + movie_keys[:movies_kept].tolist()]
+        nx.set_node_attributes(graph_nx, dict(enumerate(kinds)), 'kind')
+        nx.set_node_attributes(graph_nx, dict(enumerate(db_ids)), 'db_id')
+
+        return graph_nx
+
+
+class GraphView(Graph):
+    """A read-only view of a movie graph which only contains some of its movies (and all of its actors).
+
+    The view shares the vertices of the underlying graph and hides the other movies with a mask, so all query methods
+    of Graph only see the movies in the view. The ratings of the actors are the ones of the underlying graph, so
+    evaluate_all_actor_ratings raises a ValueError and score_actors scores them on the view instead.
+    The view itself can't be modified. Movies added to the underlying graph later are not part of the view, but the
+    edges of its actors are kept up to date.
+    """
+    # Private Instance Attributes:
+    #     - _graph:
+    #         The graph this is a view of.
+    #     - _movies:
+    #         The movie vertices which are part of this view.
+    #     - _movie_mask:
+    #         Whether each column of the biadjacency matrix of _graph is part of this view.
+    #     - _source:
+    #         The biadjacency matrix of _graph the cached biadjacency matrix of this view was computed from.
+    _graph: Graph
+    _movies: set[_Vertex]
+    _movie_mask: np.ndarray | None
+    _source: sparse.csr_array | None
+
+    def __init__(self, graph: Graph, movies: set[_Vertex]) -> None:
+        """Initialize a view of the given graph containing only the given movie vertices.
+
+        Preconditions:
+            - all(v in graph._movie_vertices() for v in movies)
+        """
+        super().__init__()
+        self._vertices = graph._vertices
+        self._names_to_ids = graph._names_to_ids
+        self._stats = graph._stats
+        self._genre_movies = {genre: genre_movies & movies for genre, genre_movies in graph._genre_movies.items()}
+        self._graph = graph
+        self._movies = movies
+        self._movie_mask = None
+        self._source = None
+
+    def add_vertex(self, item: Any) -> None:
+        """Raise a ValueError, since a view can't be modified."""
+        raise ValueError("A GraphView is read-only")
+
+    def add_edge(self, item1: Any, item2: Any) -> None:
+        """Raise a ValueError, since a view can't be modified."""
+        raise ValueError("A GraphView is read-only")
+
+    def _neighbours(self, v: _Vertex) -> set[_Vertex]:
+        """Return the neighbouring vertices of the given vertex which are part of this view."""
+        if isinstance(v.item, Movie):
+            return v.neighbours if v in self._movies else set()
+        else:
+            return v.neighbours & self._movies
+
+    def _movie_vertices(self) -> list[_Vertex]:
+        """Return all movie vertices which are part of this view."""
+        return list(self._movies)
+
+    def _all_vertices(self) -> Iterator[_Vertex]:
+        """Return an iterator over all actors and the movies which are part of this view, in the order they were
+        added to the underlying graph.
+        """
+        return (v for v in self._vertices.values() if isinstance(v.item, Actor) or v in self._movies)
+
+    def _movie_columns(self) -> np.ndarray:
+        """Return the sorted columns of the biadjacency matrix of the movies which are part of this view."""
+        self._get_biadjacency()
+        return np.flatnonzero(self._movie_mask)
+
+    def scoring_prior(self) -> tuple[float, float]:
+        """Return the prior of the underlying graph, so that the 'bayesian' scores of a view are the same as those of
+        the same query on the graph with the filter of the view (e.g. a genre).
+        """
+        return self._graph.scoring_prior()
+
+    def evaluate_all_actor_ratings(self, method: str = 'mean') -> None:
+        """Raise a ValueError, since the actors are shared with the underlying graph, so their ratings can't be
+        evaluated from the movies of this view only. Use score_actors to score them on this view instead.
+        """
+        raise ValueError("A GraphView can't change the ratings of its actors, use score_actors instead")
+
+    def get_all_vertices(self, kind: any = '') -> set:
+        """Return a set of all vertex items in this view.
+
+        If kind != '', only return the items of the given vertex kind.
+
+        Preconditions:
+            - kind in {'', Movie, Actor}
+        """
+        if kind == Movie:
+            return {v.item for v in self._movies}
+        elif kind != '':
+            return super().get_all_vertices(kind)
+        else:
+            return {decode_id(key) for key, v in self._vertices.items()
+                    if isinstance(v.item, Actor) or v in self._movies}
+
+    def _get_biadjacency(self) -> tuple[sparse.csr_array, np.ndarray, np.ndarray]:
+        """Return the biadjacency matrix of this view, together with the keys of the actors (rows) and movies
+        (columns).
+
+        Rows and columns are the same as in the underlying graph, the columns of the movies outside of this view are
+        empty. When the matrix of the underlying graph was rebuilt, the caches computed from the old one are cleared.
+        """
+        matrix, actor_keys, movie_keys = self._graph._get_biadjacency()
+        if self._biadjacency is None or self._source is not matrix:
+            movie_index = self._graph._movie_index
+            self._movie_mask = np.zeros(len(movie_keys), dtype=bool)
+            self._movie_mask[[movie_index[v.item.key] for v in self._movies]] = True
+
+            masked = matrix.multiply(self._movie_mask).tocsr().astype(np.int32)
+            masked.eliminate_zeros()
+            masked.sort_indices()
+
+            self._actor_keys = actor_keys
+            self._movie_keys = movie_keys
+            self._actor_index = self._graph._actor_index
+            self._movie_index = movie_index
+            self._biadjacency = masked
+            self._adjacency = None
+            self._genre_aggregates = None
+            self._timelines = None
+            self._pair_timelines = collections.OrderedDict()
+            self._memory = None
+            self._source = matrix
+
+        return self._biadjacency, self._actor_keys, self._movie_keys
+
+
+def _scoring_weights(votes: np.ndarray, method: str) -> np.ndarray:
+    """Return the weight of movies with the given numbers of votes for the given scoring method. Movies without a
+    known number of votes count as a single vote.
+
+    Raise a ValueError if method is not one of SCORING_METHODS.
+    """
+    if method not in SCORING_METHODS:
+        raise ValueError
+    elif method == 'mean':
+        return np.ones(len(votes))
+    else:
+        return np.maximum(votes, 1).astype(np.float64)
+
+
+def _combine_scores(weighted_sums: np.ndarray, weight_sums: np.ndarray, method: str,
+                    prior: tuple[float, float]) -> np.ndarray:
+    """Return the scores for the given sums of weighted ratings and sums of weights, with the given scoring method and
+    prior (see Graph.scoring_prior).
+
+    Preconditions:
+        - all(weight_sums > 0)
+    """
+    if method == 'bayesian':
+        prior_rating, prior_weight = prior
+        return (prior_weight * prior_rating + weighted_sums) / (prior_weight + weight_sums)
+    else:
+        return weighted_sums / weight_sums
+
+
+def _expand_frontier(adjacency: sparse.csr_array, frontier: np.ndarray, visited: np.ndarray, parents: np.ndarray,
+                     depths: np.ndarray) -> np.ndarray:
+    """Helper function for a level of breadth first search. Visit all unvisited neighbours of the given frontier,
+    record their parents and depths and return them as the new frontier.
+    """
+    starts = adjacency.indptr[frontier]
+    counts = adjacency.indptr[frontier + 1] - starts
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    neighbours = adjacency.indices[np.repeat(starts, counts) + offsets]
+    sources = np.repeat(frontier, counts)
+
+    unvisited = ~visited[neighbours]
+    neighbours, first = np.unique(neighbours[unvisited], return_index=True)
+    sources = sources[unvisited][first]
+
+    visited[neighbours] = True
+    parents[neighbours] = sources
+    depths[neighbours] = depths[sources] + 1
+    return neighbours
+
+
+def _trace_back(parents: np.ndarray, vertex: int) -> list[int]:
+    """Helper function which returns the path from the given vertex back to the root of the search tree given by
+    parents.
+    """
+    path = [int(vertex)]
+    while parents[path[-1]] != -1:
+        path.append(int(parents[path[-1]]))
+    return path
+
+
+class CoStarGraph:
+    """An actor-actor view of a movie graph, in which two actors are adjacent if they played in a movie together.
+
+    The whole projection is computed at once with sparse matrix products of the actor x movie biadjacency matrix, so
+    ranking the costars of an actor is a lookup of a single row. Pairs of actors are rated with one of
+    SCORING_METHODS.
+    """
+    # Private Instance Attributes:
+    #     - _graph:
+    #         The movie graph this projection was computed from.
+    #     - _actor_keys:
+    #         The keys of the actors (see encode_id), in the order of the rows and columns of the projection.
+    #     - _actor_index:
+    #         Maps actor key to its row in the projection.
+    #     - _collaborations:
+    #         Actor x actor matrix with the number of movies each pair of actors played in together.
+    #     - _ratings:
+    #         Actor x actor matrix with the score of the movies each pair played in together.
+    _graph: Graph
+    _actor_keys: np.ndarray
+    _actor_index: dict[int, int]
+    _collaborations: sparse.csr_array
+    _ratings: sparse.csr_array
+
+    def __init__(self, graph: Graph, method: str = 'mean') -> None:
+        """Compute the co-star projection of the given movie graph, scoring the movies of each pair with the given
+        method (see SCORING_METHODS).
+
+        Raise a ValueError if method is not one of SCORING_METHODS.
+
+        Preconditions:
+            - all(1 <= rating <= 10 for rating in graph.movie_ratings())
+        """
+        matrix, actor_keys, _ = graph._get_biadjacency()
+        weights = _scoring_weights(graph.movie_votes(), method)
+
+        # All weights and ratings are positive, so the three projections have the same sparsity structure
+        collaborations = (matrix @ matrix.T).tocsr()
+        weight_sums = (matrix.multiply(weights).tocsr() @ matrix.T).tocsr()
+        rating_sums = (matrix.multiply(weights * graph.movie_ratings()).tocsr() @ matrix.T).tocsr()
+        for projection in (collaborations, weight_sums, rating_sums):
+            projection.setdiag(0)
+            projection.eliminate_zeros()
+            projection.sort_indices()
+
+        self._graph = graph
+        self._actor_keys = actor_keys
+        self._actor_index = graph._actor_index
+        self._collaborations = collaborations
+        self._ratings = weight_sums
+        self._ratings.data = _combine_scores(rating_sums.data, weight_sums.data, method, graph.scoring_prior())
+
+    @property
+    def actor_ids(self) -> list[str]:
+        """The ids of the actors, in the order of the rows and columns of the projection."""
+        return [decode_id(key) for key in self._actor_keys.tolist()]
+
+    def _row(self, projection: sparse.csr_array, actor: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return the column indices and values of the row of the given actor in the given projection.
+
+        Raise a ValueError if actor is not in this graph.
+        """
+        key = self._graph._key(actor)
+        if key not in self._actor_index:
+            raise ValueError
+
+        i = self._actor_index[key]
+        start, end = projection.indptr[i], projection.indptr[i + 1]
+        return projection.indices[start:end], projection.data[start:end]
+
+    def _entry(self, projection: sparse.csr_array, actor1: str, actor2: str) -> float:
+        """Return the entry of the given pair of actors in the given projection, or 0 if there is none.
+
+        Raise a ValueError if actor1 or actor2 do not appear in this graph.
+        """
+        key2 = self._graph._key(actor2)
+        if key2 not in self._actor_index:
+            raise ValueError
+
+        columns, values = self._row(projection, actor1)
+        j = self._actor_index[key2]
+        k = np.searchsorted(columns, j)
+        if k < len(columns) and columns[k] == j:
+            return values[k]
+        else:
+            return 0
+
+    def get_num_collaborations(self, actor1: str, actor2: str) -> int:
+        """Return the number of movies actor1 and actor2 played in together.
+
+        Raise a ValueError if actor1 or actor2 do not appear in this graph.
+        """
+        return int(self._entry(self._collaborations, actor1, actor2))
+
+    def get_collaborative_rating(self, actor1: str, actor2: str) -> float:
+        """Return the average rating of the movies actor1 and actor2 played in together, or -1 if there are none.
+
+        Raise a ValueError if actor1 or actor2 do not appear in this graph.
+        """
+        if actor1 == actor2 or self.get_num_collaborations(actor1, actor2) == 0:
+            return -1
+        return float(self._entry(self._ratings, actor1, actor2))
+
+    def get_costars(self, actor: str, min_num_collab: int = 1) -> dict[str, float]:
+        """Return a dictionary mapping the id of every costar of the given actor, with whom they played in at least
+        min_num_collab movies, to the average rating of those movies.
+
+        Raise a ValueError if actor does not appear in this graph.
+        """
+        columns, counts = self._row(self._collaborations, actor)
+        _, ratings = self._row(self._ratings, actor)
+        keep = counts >= min_num_collab
+        return {decode_id(key): float(rating)
+                for key, rating in zip(self._actor_keys[columns[keep]].tolist(), ratings[keep].tolist())}
+
+    def find_casting_team(self, actor: str, number_of_actors: int, min_num_collab: int) -> list[str]:
+        """
+        Return the names of the actors who have collaborated with the given actor in at least min_num_collab movies,
+        sorted in descending order of their average collaborative performance.
+
+        actor is the id of the actor being found casting team for. The length of the returned list is at most
+        number_of_actors.
+
+        Raise a ValueError if actor does not appear in this graph.
+        """
+        columns, counts = self._row(self._collaborations, actor)
+        _, ratings = self._row(self._ratings, actor)
+        keep = counts >= min_num_collab
+        columns, ratings = columns[keep], ratings[keep]
+
+        order = np.argsort(-ratings, kind='stable')[:number_of_actors]
+        return [self._graph.get_name(key) for key in self._actor_keys[columns[order]].tolist()]
+
+
+class MinHashIndex:
+    """An approximate index of the actors of a movie graph by the similarity of their filmographies, for finding the
+    actors whose movies overlap most with a given actor without intersecting their movies with every costar.
+
+    The similarity of two actors is the Jaccard similarity of their sets of movies. Every actor gets a MinHash
+    signature of num_perm values, split into bands of num_perm // bands rows. Actors whose signatures agree on all rows
+    of at least one band become candidates (locality-sensitive hashing), and the candidates are re-ranked by their
+    exact similarity. Two actors with similarity s become candidates with probability 1 - (1 - s ** rows) ** bands, so
+    more bands find more of the less similar actors at the cost of more candidates to re-rank.
+
+    The default of 64 bands of 2 rows makes actors with a similarity of 1/4 candidates with probability 0.98, so
+    most_similar finds the most similar costar of nearly every actor (typically around 1/3 similar). For
+    near_duplicates alone, fewer bands of more rows (e.g. 16 bands of 4 rows) find the very similar pairs with far
+    fewer candidates.
+
+    Instance Attributes:
+        - num_perm: The number of hash functions of the signatures.
+        - bands: The number of bands the signatures are split into.
+
+    Representation Invariants:
+        - self.num_perm % self.bands == 0
+    """
+    num_perm: int
+    bands: int
+    # Private Instance Attributes:
+    #     - _graph:
+    #         The graph this index was built from.
+    #     - _matrix:
+    #         The actor x movie biadjacency matrix of the graph.
+    #     - _actor_keys:
+    #         The keys of the actors (see encode_id), in the row order of the biadjacency matrix.
+    #     - _actor_index:
+    #         Maps the key of every actor to their row in the biadjacency matrix.
+    #     - _coefficients:
+    #         The (a, b) coefficients of the hash functions (a * movie + b) % MINHASH_PRIME, one row per function.
+    #     - _band_keys:
+    #         For every band, the sorted keys of the signatures of all actors with at least one movie.
+    #     - _band_actors:
+    #         For every band, the rows of the actors in the order of _band_keys.
+    _graph: Graph
+    _matrix: sparse.csr_array
+    _actor_keys: np.ndarray
+    _actor_index: dict[int, int]
+    _coefficients: np.ndarray
+    _band_keys: np.ndarray
+    _band_actors: np.ndarray
+
+    def __init__(self, graph: Graph, num_perm: int = 128, bands: int = 64, seed: int = 0) -> None:
+        """Build the index of the actors of the given graph, with signatures of num_perm hash functions split into
+        the given number of bands. The same seed always creates the same hash functions.
+
+        Raise a ValueError if num_perm is not a positive multiple of bands.
+        """
+        if bands < 1 or num_perm < bands or num_perm % bands != 0:
+            raise ValueError(f"num_perm has to be a positive multiple of bands, not {num_perm}")
+
+        matrix, actor_keys, _ = graph._get_biadjacency()
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self._graph = graph
+        self._matrix = matrix
+        self._actor_keys = actor_keys
+        self._actor_index = graph._actor_index
+        self._coefficients = np.column_stack([rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.int64),
+                                              rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.int64)])
+
+        # The signature of every actor is the minimum hash of their movies, for each hash function. It is computed
+        # one function at a time, so only one hash per edge is held in memory, and folded into the band keys
+        # right away instead of being kept.
+        rows = np.flatnonzero(np.diff(matrix.indptr) > 0)
+        starts = matrix.indptr[rows]
+        movies = matrix.indices.astype(np.int64)
+        keys = np.zeros((bands, len(rows)), dtype=np.uint64)
+        for k, (a, b) in enumerate(self._coefficients):
+            minimum = np.minimum.reduceat((a * movies + b) % MINHASH_PRIME, starts)
+            keys[k * bands // num_perm] = keys[k * bands // num_perm] * MINHASH_MULTIPLIER + minimum.astype(np.uint64)
+
+        order = np.argsort(keys, axis=1, kind='stable')
+        self._band_keys = np.take_along_axis(keys, order, axis=1)
+        self._band_actors = rows[order].astype(np.int32)
+
+    @property
+    def actor_ids(self) -> list[str]:
+        """The ids of the actors, in the row order of the biadjacency matrix of the graph."""
+        return [decode_id(key) for key in self._actor_keys.tolist()]
+
+    def _signature_keys(self, movies: np.ndarray) -> np.ndarray:
+        """Return the band keys of the signature of the given non-empty array of movie columns."""
+        a, b = self._coefficients[:, :1], self._coefficients[:, 1:]
+        signature = ((a * movies.astype(np.int64) + b) % MINHASH_PRIME).min(axis=1).astype(np.uint64)
+        keys = np.zeros(self.bands, dtype=np.uint64)
+        for minimum in signature.reshape(self.bands, -1).T:
+            keys = keys * MINHASH_MULTIPLIER + minimum
+        return keys
+
+    def _movies(self, actor: str) -> np.ndarray:
+        """Return the movie columns of the given actor.
+
+        Raise a ValueError if actor does not appear in the graph.
+        """
+        key = self._graph._key(actor)
+        if key not in self._actor_index:
+            raise ValueError(f"Actor not found: {actor}")
+
+        i = self._actor_index[key]
+        return self._matrix.indices[self._matrix.indptr[i]:self._matrix.indptr[i + 1]]
+
+    def candidates(self, actor: str) -> list[str]:
+        """Return the ids of the actors which share at least one band of their signature with the given actor,
+        excluding the actor themself. These include most of the actors similar to them, but also some which aren't.
+
+        Raise a ValueError if actor does not appear in the graph.
+        """
+        return [decode_id(key) for key in self._actor_keys[self._candidate_rows(actor)].tolist()]
+
+    def _candidate_rows(self, actor: str) -> np.ndarray:
+        """Return the sorted rows of the candidates of the given actor. See candidates."""
+        movies = self._movies(actor)
+        if len(movies) == 0:
+            return np.zeros(0, dtype=np.int32)
+
+        found = []
+        for band, key in enumerate(self._signature_keys(movies)):
+            start = np.searchsorted(self._band_keys[band], key, side='left')
+            end = np.searchsorted(self._band_keys[band], key, side='right')
+            found.append(self._band_actors[band, start:end])
+
+        rows = np.unique(np.concatenate(found))
+        return rows[rows != self._actor_index[self._graph._key(actor)]]
+
+    def _similarities(self, rows1: np.ndarray, rows2: np.ndarray) -> np.ndarray:
+        """Return the exact Jaccard similarities of the movies of the actors in rows1 and rows2, pairwise."""
+        intersections = np.asarray(self._matrix[rows1].multiply(self._matrix[rows2]).sum(axis=1)).ravel()
+        sizes = np.diff(self._matrix.indptr)
+        return intersections / (sizes[rows1] + sizes[rows2] - intersections)
+
+    def most_similar(self, actor: str, number_of_actors: int = 10,
+                     min_similarity: float = 0.0) -> list[tuple[str, float]]:
+        """Return the ids of the candidates most similar to the given actor with their exact Jaccard similarity, in
+        descending order of similarity. Only candidates with a similarity above min_similarity are returned, at most
+        number_of_actors of them.
+
+        Raise a ValueError if actor does not appear in the graph.
+        """
+        rows = self._candidate_rows(actor)
+        similarities = self._similarities(np.full(len(rows), self._actor_index[self._graph._key(actor)]), rows)
+        keep = similarities > min_similarity
+        rows, similarities = rows[keep], similarities[keep]
+
+        order = np.argsort(-similarities, kind='stable')[:number_of_actors]
+        return [(decode_id(int(self._actor_keys[rows[k]])), float(similarities[k])) for k in order]
+
+    def near_duplicates(self, threshold: float = 0.8) -> list[tuple[str, str, float]]:
+        """Return all pairs of actors found by the index whose exact Jaccard similarity is at least threshold, like
+        actors who are always credited together, as (id1, id2, similarity) in descending order of similarity.
+
+        Preconditions:
+            - 0 < threshold <= 1
+        """
+        pairs = set()
+        for keys, actors in zip(self._band_keys, self._band_actors):
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            for bucket in np.split(actors, boundaries):
+                if len(bucket) > 1:
+                    bucket = np.sort(bucket)
+                    first, second = np.triu_indices(len(bucket), 1)
+                    pairs.update(zip(bucket[first].tolist(), bucket[second].tolist()))
+
+        if len(pairs) == 0:
+            return []
+
+        rows1, rows2 = np.array(sorted(pairs)).T
+        similarities = self._similarities(rows1, rows2)
+        keep = np.flatnonzero(similarities >= threshold)
+        keep = keep[np.argsort(-similarities[keep], kind='stable')]
+        return [(decode_id(int(self._actor_keys[rows1[k]])), decode_id(int(self._actor_keys[rows2[k]])),
+                 float(similarities[k])) for k in keep]
@@ -1,18 +1,25 @@
 """"
 This python file will handle all the functions for an interactive interface.
 """
+from __future__ import annotations
+from typing import Callable, TYPE_CHECKING
 
 # import pygame
-import PySimpleGUI as sg
-import networkx as nx
-from plotly.graph_objs import Scatter, Figure
 import datastructures
+import datasets
+import queries
+
+# PySimpleGUI takes a while to import, so it is only imported once the interface is run, and every window is only
+# created the first time it is opened
+if TYPE_CHECKING:
+    import PySimpleGUI as sg
 
 
 # FINAL VARIABLES
 METHODS = ["The average performance of a group of actors",
            "The best performing movie of a group of actors",
            "The castmates of a particular actor",
+           "The ratings of an actor or a pair of actors over time",
            "See a graph of all the movies and actors! (May take a while)"]
 
 
@@ -20,6 +27,9 @@ BEST_MOVIE_TEXT = "The actors\' best movie together was: "
 CASTMATES_TEXT = "The casting team created from highest to lowest collaborative performance is: "
 ACTOR_MISSING = "Sorry, at least one actor was not found. Try checking your spelling or formatting."
 NOT_ALL_ACTORS = "Sorry, there were no movies containing all actors. Try checking your spelling or formatting."
+SCORING_TEXT = "Score the movies by: "
+GENRE_TEXT = "Only count the movies of the genre (optional): "
+TIMELINE_TEXT = "The average rating of their movies in these years was: "
 ENTER_N = "Please enter the actors\' names in First/Last order, separated by commas and spaces except for at the end"
 
 MARGINS = (300, 250)
@@ -27,108 +37,167 @@ NORMAL_FONT = ("Arial", 20)
 SMALLER_FONT = ("Arial", 14)
 SMALL_FONT = ("Arial", 10)
 
-ACTOR_MOVIE_GRAPH = datastructures.Graph()
-ACTOR_MOVIE_GRAPH.load_movie_graph("data/sample_db/actors_10k.tsv", "data/sample_db/titles_10k.tsv",
-                                   "data/sample_db/ratings_10k.tsv", "data/sample_db/principals_10k.tsv")
-ACTOR_MOVIE_GRAPH.evaluate_all_actor_ratings()
+# Graphs of recently used datasets are kept in memory up to this many bytes, so switching back to them is instant
+GRAPH_CACHE_BYTES = 2 * 2 ** 30
+DATASETS = datasets.discover_datasets()
+GRAPH_CACHE = datasets.GraphCache(GRAPH_CACHE_BYTES)
+selected_dataset = "sample_db" if "sample_db" in DATASETS or not DATASETS else next(iter(DATASETS))
 
 LINE_COLOUR = 'rgb(210,210,210)'
 VERTEX_BORDER_COLOUR = 'rgb(50, 50, 50)'
 ACTOR_COLOUR = 'rgb(89, 205, 105)'
 MOVIE_COLOUR = 'rgb(105, 89, 205)'
 
+# The windows which were opened so far, by title. They are hidden instead of closed, so they keep their contents.
+WINDOWS = {}
+
 
 # FUNCTIONS====================================
+def get_graph() -> datastructures.Graph:
+    """ Returns the graph of actors and movies of the selected dataset. It is loaded and rated the first time this is
+    called, so that importing this file and opening the first window don't have to wait for it, and then kept in
+    GRAPH_CACHE.
+
+    """
+    return GRAPH_CACHE.get(DATASETS.get(selected_dataset, queries.SAMPLE_DATASET))
+
+
+def get_actor_ids(graph: datastructures.Graph, names: list[str]) -> list[str]:
+    """ Returns the ids of the actors with the given names in graph. Raises a ValueError if one of the names isn't the
+    name of an actor (including the names of movies).
+
+    """
+    actor_ids = [graph.get_id(n) for n in names]
+    if not all(graph.is_actor(actor_id) for actor_id in actor_ids):
+        raise ValueError
+    return actor_ids
+
+
+def get_window(title: str, layout: Callable[[], list]) -> sg.Window:
+    """ Returns the window with the given title, which is created with the given layout function the first time it is
+    needed.
+
+    """
+    import PySimpleGUI as sg
+
+    if title not in WINDOWS:
+        WINDOWS[title] = sg.Window(title, layout(), margins=MARGINS)
+    elif WINDOWS[title].is_hidden():
+        WINDOWS[title].un_hide()
+    return WINDOWS[title]
+
+
+def select_dataset(name: str) -> None:
+    """ Selects the dataset used by all screens, out of the datasets found in the data directory.
+
+    """
+    global selected_dataset
+    selected_dataset = name
+
+
 def run_collabs() -> None:
     """ Runs the screen for evaluate_collaborative_performance from datastructures.py
 
     """
+    import PySimpleGUI as sg
+
+    window = get_window("Collaboration Rating", collab_layout)
     while True:
-        _event, _values = COLLAB.read()
+        _event, _values = window.read()
         # print(_event, _values)
 
         if _event == sg.WIN_CLOSED or _event == "Cancel":
-            COLLAB["-COLLAB-"].update(value="The actors\' average score working together was: ")
-            COLLAB.hide()
+            window["-COLLAB-"].update(value="The actors\' average score working together was: ")
+            window.hide()
             break
 
         if _event == "Submit":
             actor_list = _values[0].split(", ")
 
             # print(actor_list)
+            graph = get_graph()
             try:
-                actor_id = [ACTOR_MOVIE_GRAPH.get_id(n) for n in actor_list]
+                actor_id = get_actor_ids(graph, actor_list)
             except ValueError:
-                COLLAB["-COLLAB-"].update(value=ACTOR_MISSING)
+                window["-COLLAB-"].update(value=ACTOR_MISSING)
             else:
-                score = ACTOR_MOVIE_GRAPH.evaluate_collaborative_performance(actor_id)
+                score = graph.evaluate_collaborative_performance(actor_id, _values["-METHOD-"], _values["-GENRE-"])
                 if score != -1:
-                    COLLAB["-COLLAB-"].update(value="The actors\' average score working together was: " + str(score))
+                    window["-COLLAB-"].update(value="The actors\' average score working together was: " + str(score))
 
                 else:
-                    COLLAB["-COLLAB-"].update(value=NOT_ALL_ACTORS)
+                    window["-COLLAB-"].update(value=NOT_ALL_ACTORS)
 
 
 def run_best_movie() -> None:
     """ Runs the screen for find_best_movie_together in datastructures.py
 
     """
+    import PySimpleGUI as sg
+
+    window = get_window("Best Movie Together", best_layout)
     while True:
-        _event, _values = BEST.read()
+        _event, _values = window.read()
         # print(_event, _values)
 
         if _event == sg.WIN_CLOSED or _event == "Cancel":
-            BEST["-MOVIE-"].update(value=BEST_MOVIE_TEXT)
-            BEST.hide()
+            window["-MOVIE-"].update(value=BEST_MOVIE_TEXT)
+            window.hide()
             break
 
         if _event == "Submit":
             actor_list = _values[0].split(", ")
+            graph = get_graph()
             try:
-                actor_id = [ACTOR_MOVIE_GRAPH.get_id(n) for n in actor_list]
+                actor_id = get_actor_ids(graph, actor_list)
             except ValueError:
-                BEST["-MOVIE-"].update(value=ACTOR_MISSING)
+                window["-MOVIE-"].update(value=ACTOR_MISSING)
             else:
-                best_movie_together = ACTOR_MOVIE_GRAPH.find_best_movie_together(actor_id)
+                best_movie_together = graph.find_best_movie_together(actor_id, _values["-GENRE-"])
 
                 if best_movie_together != "/N":
-                    best_movie_together = ACTOR_MOVIE_GRAPH.get_name(best_movie_together)
+                    best_movie_together = graph.get_name(best_movie_together)
 
                     # print(best_movie_together)
-                    BEST["-MOVIE-"].update(value=BEST_MOVIE_TEXT + best_movie_together)
+                    window["-MOVIE-"].update(value=BEST_MOVIE_TEXT + best_movie_together)
 
                 else:
-                    BEST["-MOVIE-"].update(value=NOT_ALL_ACTORS)
+                    window["-MOVIE-"].update(value=NOT_ALL_ACTORS)
 
 
 def run_find_castmates() -> None:
     """ Runs the screen for find_casting_team in datastructures.py
 
     """
+    import PySimpleGUI as sg
+
+    window = get_window("Finding Castmates!", castmates_layout)
     while True:
-        _event, _values = CASTMATES.read()
+        _event, _values = window.read()
         # print(_event, _values)
 
         if _event == sg.WIN_CLOSED or _event == "Cancel":
-            update_castmates()
-            CASTMATES.hide()
+            update_castmates(window)
+            window.hide()
             break
 
         if _event == "Submit":
-            update_castmates()
+            update_castmates(window)
 
+            graph = get_graph()
             try:
-                actor_id = ACTOR_MOVIE_GRAPH.get_id(_values["-CENTER NAME-"])
+                actor_id = get_actor_ids(graph, [_values["-CENTER NAME-"]])[0]
             except ValueError:
-                CASTMATES["-COSTARS-"].update(value=ACTOR_MISSING)
+                window["-COSTARS-"].update(value=ACTOR_MISSING)
             else:
                 if _values["-NUM COSTARS-"] == "":
-                    CASTMATES["-COSTARS-"].update(value="Please enter a valid number of costars.")
+                    window["-COSTARS-"].update(value="Please enter a valid number of costars.")
                 elif _values["-MIN COLLABS-"] == "":
-                    CASTMATES["-COSTARS-"].update(value="Please enter a valid number of minimum collaborations.")
+                    window["-COSTARS-"].update(value="Please enter a valid number of minimum collaborations.")
                 else:
-                    team_list = ACTOR_MOVIE_GRAPH.find_casting_team(actor_id, int(_values["-NUM COSTARS-"]),
-                                                                    int(_values["-MIN COLLABS-"]))
+                    team_list = graph.find_casting_team(actor_id, int(_values["-NUM COSTARS-"]),
+                                                        int(_values["-MIN COLLABS-"]), _values["-METHOD-"],
+                                                        _values["-GENRE-"])
                     num_actors = len(team_list)
                     rows = num_actors // 5
                     # print(team_list)
@@ -138,7 +207,7 @@ def run_find_castmates() -> None:
                         for i in range(row * 5, min(row * 5 + 5, num_actors)):
                             team += team_list[i] + ", "
 
-                        CASTMATES["-BLANK" + str(row) + "-"].update(value=team)
+                        window["-BLANK" + str(row) + "-"].update(value=team)
 
                     if rows * 5 == num_actors and rows * 5 < 25:
                         team = ""
@@ -146,28 +215,108 @@ def run_find_castmates() -> None:
                             team += team_list[i] + ", "
 
                         team = team[:len(team) - 2]
-                        CASTMATES["-BLANK" + str(rows) + "-"].update(value=team)
+                        window["-BLANK" + str(rows) + "-"].update(value=team)
                     else:
                         team = ""
                         for i in range(rows * 5, num_actors):
                             team += team_list[i] + ", "
 
                         team = team[:len(team) - 2]
-                        text = sg.Text.get(CASTMATES["-BLANK" + str(min(rows, 4)) + "-"])
+                        text = window["-BLANK" + str(min(rows, 4)) + "-"].get()
                         team = text + team
-                        CASTMATES["-BLANK" + str(min(rows, 4)) + "-"].update(value=team)
+                        window["-BLANK" + str(min(rows, 4)) + "-"].update(value=team)
+
+
+def run_timeline() -> None:
+    """ Runs the screen for get_average_rating and get_career_timeline in datastructures.py
 
+    """
+    import PySimpleGUI as sg
+
+    window = get_window("Ratings Over Time", timeline_layout)
+    while True:
+        _event, _values = window.read()
+
+        if _event == sg.WIN_CLOSED or _event == "Cancel":
+            window["-TIMELINE-"].update(value=TIMELINE_TEXT)
+            window.hide()
+            break
+
+        if _event == "Submit":
+            actor_list = _values["-TIMELINE ACTORS-"].split(", ")
+            try:
+                start_year = int(_values["-START YEAR-"]) if _values["-START YEAR-"] != "" else -1
+                end_year = int(_values["-END YEAR-"]) if _values["-END YEAR-"] != "" else -1
+            except ValueError:
+                window["-TIMELINE-"].update(value="Please enter valid years.")
+                continue
+
+            graph = get_graph()
+            try:
+                actor_id = get_actor_ids(graph, actor_list)
+            except ValueError:
+                window["-TIMELINE-"].update(value=ACTOR_MISSING)
+            else:
+                if len(actor_id) > 2:
+                    window["-TIMELINE-"].update(value="Please enter one or two actors.")
+                    continue
+
+                try:
+                    score = graph.get_average_rating(actor_id, start_year, end_year)
+                except ValueError:
+                    window["-TIMELINE-"].update(value=ACTOR_MISSING)
+                    continue
+
+                if score != -1:
+                    window["-TIMELINE-"].update(value=TIMELINE_TEXT + str(round(score, 2)))
+                    plot_timeline(graph, actor_id, start_year, end_year)
+                else:
+                    window["-TIMELINE-"].update(value=NOT_ALL_ACTORS)
 
-def update_castmates() -> None:
+
+def plot_timeline(graph: datastructures.Graph, actors: list[str], start_year: int = -1, end_year: int = -1,
+                  output_file: str = '') -> None:
+    """Use plotly to plot the average rating and number of movies of the given actor or pair of actors per year,
+    between start_year and end_year (-1 for no restriction).
+
+    Optional arguments:
+        - output_file: a filename to save the plotly image to (rather than displaying
+            in your web browser)
+    """
+    # plotly takes a while to import, so it is only imported once a timeline is plotted
+    from plotly.graph_objs import Bar, Scatter, Figure
+
+    timeline = [(year, movies, rating) for year, movies, rating in graph.get_career_timeline(actors)
+                if (start_year == -1 or year >= start_year) and (end_year == -1 or year <= end_year)]
+    years = [year for year, _, _ in timeline]
+
+    ratings = Scatter(x=years, y=[rating for _, _, rating in timeline], mode='lines+markers',
+                      name='average rating', line={"color": MOVIE_COLOUR})
+    movies = Bar(x=years, y=[movies for _, movies, _ in timeline], name='movies', yaxis='y2',
+                 marker={"color": LINE_COLOUR})
+
+    fig = Figure(data=[movies, ratings])
+    fig.update_layout({'title': ' & '.join(graph.get_name(actor) for actor in actors),
+                       'xaxis': {'title': 'year'},
+                       'yaxis': {'title': 'average rating', 'range': [0, 10]},
+                       'yaxis2': {'title': 'movies', 'overlaying': 'y', 'side': 'right', 'showgrid': False}})
+
+    if output_file == '':
+        fig.show()
+    else:
+        fig.write_image(output_file)
+
+
+def update_castmates(window: sg.Window) -> None:
     """Helper for run_find_castmates to facilitate resetting the window.
 
     """
-    CASTMATES["-COSTARS-"].update(value=CASTMATES_TEXT)
-    CASTMATES["-BLANK0-"].update(value="")
-    CASTMATES["-BLANK1-"].update(value="")
-    CASTMATES["-BLANK2-"].update(value="")
-    CASTMATES["-BLANK3-"].update(value="")
-    CASTMATES["-BLANK4-"].update(value="")
+    window["-COSTARS-"].update(value=CASTMATES_TEXT)
+    window["-BLANK0-"].update(value="")
+    window["-BLANK1-"].update(value="")
+    window["-BLANK2-"].update(value="")
+    window["-BLANK3-"].update(value="")
+    window["-BLANK4-"].update(value="")
 
 
 # MODIFIED FROM ex3_visualization.py
@@ -187,18 +336,21 @@ def visualize_graph(graph: datastructures.Graph, layout: str = 'spring_layout',
     #     '#6C7C32', '#778AAE', '#862A16', '#A777F1', '#620042', '#1616A7', '#DA60CA',
     #     '#6C4516', '#0D2A63', '#AF0038'
     # ]
+    # networkx and plotly take a while to import, so they are only imported once a graph is visualized
+    import networkx as nx
+    from plotly.graph_objs import Scatter, Figure
 
-    graph_nx = graph.to_networkx(max_vertices)
+    graph_nx = graph.to_sparse_networkx(max_vertices)
 
     pos = getattr(nx, layout)(graph_nx)
 
     x_values = [pos[k][0] for k in graph_nx.nodes]
     y_values = [pos[k][1] for k in graph_nx.nodes]
-    labels = list(graph_nx.nodes)
-    names = [lab.name for lab in labels if isinstance(lab, datastructures.Actor)
-             or isinstance(lab, datastructures.Movie)]
+    kinds = nx.get_node_attributes(graph_nx, 'kind')
+    db_ids = nx.get_node_attributes(graph_nx, 'db_id')
+    names = [graph.get_name(db_ids[k]) for k in graph_nx.nodes]
 
-    colours = [MOVIE_COLOUR if isinstance(lab, datastructures.Actor) else ACTOR_COLOUR for lab in labels]
+    colours = [MOVIE_COLOUR if kinds[k] == 'actor' else ACTOR_COLOUR for k in graph_nx.nodes]
 
     x_edges = []
     y_edges = []
@@ -237,52 +389,109 @@ def visualize_graph(graph: datastructures.Graph, layout: str = 'spring_layout',
 
 
 # LAYOUTS============================================
-HOME_LAYOUT = [[sg.Text('Welcome to Costar Correlations!', font=("Arial", 30), key="-TITLE-")],
-               [sg.Text('What would you like to find out?', font=NORMAL_FONT, )],
-               [sg.Combo(METHODS, font=SMALLER_FONT,
-                         enable_events=True, readonly=False, key="-METHODS-")],
-               [sg.Button('Cancel', key="-CANCEL-")],  # sg.Button("Submit", key="-SUBMIT-"),
-               [sg.Text("Note: If your clicks aren\'t registering, try holding your mouse down!",
-                        font=NORMAL_FONT, )]
-               ]
-
-COLLAB_LAYOUT = [[sg.Text(ENTER_N, font=NORMAL_FONT)],
-                 [sg.InputText(font=SMALLER_FONT)],
-                 [sg.Button("Submit"), sg.Button('Cancel')],
-                 [sg.Text("The actors\' average score working together was: ", key="-COLLAB-", font=NORMAL_FONT)]
-
-                 ]
-
-BEST_LAYOUT = [[sg.Text(ENTER_N, font=NORMAL_FONT)],
-               [sg.InputText(font=SMALLER_FONT)],
-               [sg.Text(BEST_MOVIE_TEXT, key="-MOVIE-", font=NORMAL_FONT)],
-               [sg.Button("Submit"), sg.Button('Cancel')],
-               ]
-
-CASTMATES_LAYOUT = [[sg.Text("Please enter the actor's name: ", font=NORMAL_FONT)],
-                    [sg.InputText(key="-CENTER NAME-", font=SMALLER_FONT)],
-                    [sg.Text("Please enter the number of costars you would like: ", font=NORMAL_FONT)],
-                    [sg.InputText(key="-NUM COSTARS-", font=SMALLER_FONT)],
-
-                    [sg.Text("Please enter the minimum number of collaborations with the actor: ",
-                             font=NORMAL_FONT)], [sg.InputText(key="-MIN COLLABS-", font=SMALLER_FONT)],
-
-                    [sg.Button("Submit"), sg.Button('Cancel')],
-                    [sg.Text(CASTMATES_TEXT,
-                             key="-COSTARS-", font=SMALLER_FONT)],
-                    [sg.Text(key="-BLANK0-", font=SMALLER_FONT)],
-                    [sg.Text(key="-BLANK1-", font=SMALLER_FONT)],
-                    [sg.Text(key="-BLANK2-", font=SMALLER_FONT)],
-                    [sg.Text(key="-BLANK3-", font=SMALLER_FONT)],
-                    [sg.Text(key="-BLANK4-", font=SMALLER_FONT)]
-                    ]
-
-
-# WINDOWS=======================================
-WINDOW = sg.Window('Costar Correlations', HOME_LAYOUT, margins=MARGINS)
-COLLAB = sg.Window("Collaboration Rating", COLLAB_LAYOUT, margins=MARGINS)
-BEST = sg.Window("Best Movie Together", BEST_LAYOUT, margins=MARGINS)
-CASTMATES = sg.Window("Finding Castmates!", CASTMATES_LAYOUT, margins=MARGINS)
+def home_layout() -> list:
+    """ Returns the layout of the home window.
+
+    """
+    import PySimpleGUI as sg
+
+    return [[sg.Text('Welcome to Costar Correlations!', font=("Arial", 30), key="-TITLE-")],
+            [sg.Text('What would you like to find out?', font=NORMAL_FONT, )],
+            [sg.Combo(METHODS, font=SMALLER_FONT,
+                      enable_events=True, readonly=False, key="-METHODS-")],
+            [sg.Text('Dataset: ', font=SMALLER_FONT),
+             sg.Combo(list(DATASETS), default_value=selected_dataset, font=SMALLER_FONT,
+                      enable_events=True, readonly=True, key="-DATASET-"),
+             sg.Text("", font=SMALLER_FONT, key="-DATASET STATUS-")],
+            [sg.Button('Cancel', key="-CANCEL-")],  # sg.Button("Submit", key="-SUBMIT-"),
+            [sg.Text("Note: If your clicks aren\'t registering, try holding your mouse down!",
+                     font=NORMAL_FONT, )]
+            ]
+
+
+def collab_layout() -> list:
+    """ Returns the layout of the collaboration rating window.
+
+    """
+    import PySimpleGUI as sg
+
+    return [[sg.Text(ENTER_N, font=NORMAL_FONT)],
+            [sg.InputText(font=SMALLER_FONT)],
+            [sg.Text(SCORING_TEXT, font=SMALLER_FONT),
+             sg.Combo(list(datastructures.SCORING_METHODS), default_value='mean', font=SMALLER_FONT,
+                      readonly=True, key="-METHOD-")],
+            [sg.Text(GENRE_TEXT, font=SMALLER_FONT),
+             sg.Combo([''] + list(datastructures.GENRES), default_value='', font=SMALLER_FONT,
+                      readonly=True, key="-GENRE-")],
+            [sg.Button("Submit"), sg.Button('Cancel')],
+            [sg.Text("The actors\' average score working together was: ", key="-COLLAB-", font=NORMAL_FONT)]
+
+            ]
+
+
+def best_layout() -> list:
+    """ Returns the layout of the best movie together window.
+
+    """
+    import PySimpleGUI as sg
+
+    return [[sg.Text(ENTER_N, font=NORMAL_FONT)],
+            [sg.InputText(font=SMALLER_FONT)],
+            [sg.Text(GENRE_TEXT, font=SMALLER_FONT),
+             sg.Combo([''] + list(datastructures.GENRES), default_value='', font=SMALLER_FONT,
+                      readonly=True, key="-GENRE-")],
+            [sg.Text(BEST_MOVIE_TEXT, key="-MOVIE-", font=NORMAL_FONT)],
+            [sg.Button("Submit"), sg.Button('Cancel')],
+            ]
+
+
+def castmates_layout() -> list:
+    """ Returns the layout of the castmates window.
+
+    """
+    import PySimpleGUI as sg
+
+    return [[sg.Text("Please enter the actor's name: ", font=NORMAL_FONT)],
+            [sg.InputText(key="-CENTER NAME-", font=SMALLER_FONT)],
+            [sg.Text("Please enter the number of costars you would like: ", font=NORMAL_FONT)],
+            [sg.InputText(key="-NUM COSTARS-", font=SMALLER_FONT)],
+
+            [sg.Text("Please enter the minimum number of collaborations with the actor: ",
+                     font=NORMAL_FONT)], [sg.InputText(key="-MIN COLLABS-", font=SMALLER_FONT)],
+            [sg.Text(SCORING_TEXT, font=SMALLER_FONT),
+             sg.Combo(list(datastructures.SCORING_METHODS), default_value='mean', font=SMALLER_FONT,
+                      readonly=True, key="-METHOD-")],
+            [sg.Text(GENRE_TEXT, font=SMALLER_FONT),
+             sg.Combo([''] + list(datastructures.GENRES), default_value='', font=SMALLER_FONT,
+                      readonly=True, key="-GENRE-")],
+
+            [sg.Button("Submit"), sg.Button('Cancel')],
+            [sg.Text(CASTMATES_TEXT,
+                     key="-COSTARS-", font=SMALLER_FONT)],
+            [sg.Text(key="-BLANK0-", font=SMALLER_FONT)],
+            [sg.Text(key="-BLANK1-", font=SMALLER_FONT)],
+            [sg.Text(key="-BLANK2-", font=SMALLER_FONT)],
+            [sg.Text(key="-BLANK3-", font=SMALLER_FONT)],
+            [sg.Text(key="-BLANK4-", font=SMALLER_FONT)]
+            ]
+
+
+def timeline_layout() -> list:
+    """ Returns the layout of the ratings over time window.
+
+    """
+    import PySimpleGUI as sg
+
+    return [[sg.Text("Please enter an actor's name, or two names separated by a comma and a space: ",
+                     font=NORMAL_FONT)],
+            [sg.InputText(key="-TIMELINE ACTORS-", font=SMALLER_FONT)],
+            [sg.Text("From the year (optional): ", font=SMALLER_FONT),
+             sg.InputText(key="-START YEAR-", font=SMALLER_FONT, size=(6, 1)),
+             sg.Text("to the year (optional): ", font=SMALLER_FONT),
+             sg.InputText(key="-END YEAR-", font=SMALLER_FONT, size=(6, 1))],
+            [sg.Button("Submit"), sg.Button('Cancel')],
+            [sg.Text(TIMELINE_TEXT, key="-TIMELINE-", font=NORMAL_FONT)]
+            ]
 
 
 # Event Loop to process "events" and get the "values" of the inputs
@@ -290,42 +499,56 @@ def run_interface() -> None:
     """
     Run the entire interface.
     """
+    import PySimpleGUI as sg
+
+    window = get_window('Costar Correlations', home_layout)
     while True:
-        event, values = WINDOW.read()
+        event, values = window.read()
         # print(event, values)
 
         if event == sg.WIN_CLOSED or event == "-CANCEL-":  # if user closes window or clicks cancel
             break
 
+        # Switches to the given dataset, which only has to be loaded if it isn't cached
+        if event == "-DATASET-":
+            select_dataset(values[event])
+            window["-DATASET STATUS-"].update(value="Loading...")
+            window.refresh()
+            get_graph()
+            window["-DATASET STATUS-"].update(value="")
+            continue
+
         # Runs the given method
         if values[event] == "The average performance of a group of actors":
-            if COLLAB.is_hidden():
-                COLLAB.un_hide()
-            WINDOW.hide()
+            window.hide()
 
             run_collabs()
-            WINDOW.un_hide()
+            window.un_hide()
 
         if values[event] == "The best performing movie of a group of actors":
-            if BEST.is_hidden():
-                BEST.un_hide()
-            WINDOW.hide()
+            window.hide()
 
             run_best_movie()
-            WINDOW.un_hide()
+            window.un_hide()
 
         if values[event] == "The castmates of a particular actor":
-            if CASTMATES.is_hidden():
-                CASTMATES.un_hide()
-            WINDOW.hide()
+            window.hide()
 
             run_find_castmates()
-            WINDOW.un_hide()
+            window.un_hide()
+
+        if values[event] == "The ratings of an actor or a pair of actors over time":
+            window.hide()
+
+            run_timeline()
+            window.un_hide()
 
         if values[event] == "See a graph of all the movies and actors! (May take a while)":
-            visualize_graph(ACTOR_MOVIE_GRAPH)
+            visualize_graph(get_graph())
 
-    WINDOW.close()
+    for opened in WINDOWS.values():
+        opened.close()
+    WINDOWS.clear()
 
 
 if __name__ == '__main__':
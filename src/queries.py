@@ -0,0 +1,212 @@
+"""
+Loading the movie graph and answering queries by name, shared by the entry points which don't use the interface
+(server.py and batch.py). Queries take actor names just like the interface and return json compatible dictionaries.
+"""
+from __future__ import annotations
+from typing import Any
+import concurrent.futures
+import weakref
+
+import datastructures
+
+SAMPLE_DATASET = ("data/sample_db/actors_10k.tsv", "data/sample_db/titles_10k.tsv",
+                  "data/sample_db/ratings_10k.tsv", "data/sample_db/principals_10k.tsv")
+
+# Queries which are expensive enough to be run in a worker process instead of the main process. similar_actors builds
+# the similarity index of the graph on its first call, and timeline sorts the movies of every actor by year.
+HEAVY_QUERIES = {"casting_team", "similar_actors", "timeline"}
+
+# The graph of the worker processes. It is set before the worker pool is started, so forked workers share it.
+_WORKER_GRAPH: datastructures.Graph | None = None
+
+# The similarity indexes of every graph queried for similar actors by their (num_perm, bands), each built on the first
+# query which uses it
+_SIMILARITY_INDEXES: weakref.WeakKeyDictionary[datastructures.Graph,
+                                               dict[tuple[int, int], datastructures.MinHashIndex]] = \
+    weakref.WeakKeyDictionary()
+
+
+def load_graph(actors: str, titles: str, ratings: str, principals: str) -> datastructures.Graph:
+    """
+    Load the movie graph from the given files and evaluate the ratings of all actors.
+    """
+    graph = datastructures.Graph()
+    graph.load_movie_graph(actors, titles, ratings, principals)
+    graph.evaluate_all_actor_ratings()
+    return graph
+
+
+def _actor_ids(graph: datastructures.Graph, names: Any) -> list[str]:
+    """
+    Return the ids of the actors with the given names. Raise a ValueError if names isn't a non-empty list of names
+    or one of the names isn't an actor in the graph (including the names of movies).
+    """
+    if isinstance(names, str):
+        names = [name for name in names.split(", ") if name != ""]
+    if not isinstance(names, list) or names == [] or not all(isinstance(name, str) for name in names):
+        raise ValueError("'actors' has to be a non-empty list of actor names")
+
+    ids = []
+    for name in names:
+        try:
+            db_id = graph.get_id(name)
+        except ValueError:
+            db_id = ""
+        if not graph.is_actor(db_id):
+            raise ValueError(f"Actor not found: {name}")
+        ids.append(db_id)
+    return ids
+
+
+def _positive_int(params: dict[str, Any], key: str, default: int) -> int:
+    """Return the parameter with the given key as a positive integer. Raise a ValueError if it isn't one."""
+    try:
+        value = int(params.get(key, default))
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' has to be an integer") from None
+    if value < 1:
+        raise ValueError(f"'{key}' has to be at least 1")
+    return value
+
+
+def _year(params: dict[str, Any], key: str) -> int:
+    """Return the parameter with the given key as a year, -1 (no restriction) by default. Raise a ValueError if it
+    isn't one.
+    """
+    try:
+        return int(params.get(key, -1))
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' has to be a year") from None
+
+
+def _scoring_method(params: dict[str, Any]) -> str:
+    """Return the 'method' parameter, 'mean' by default. Raise a ValueError if it isn't a scoring method."""
+    method = params.get("method", "mean")
+    if method not in datastructures.SCORING_METHODS:
+        raise ValueError(f"'method' has to be one of {', '.join(datastructures.SCORING_METHODS)}")
+    return method
+
+
+def _genre(params: dict[str, Any]) -> str:
+    """Return the 'genre' parameter, '' (all genres) by default. Raise a ValueError if it isn't a genre."""
+    genre = params.get("genre", "")
+    if genre != "" and genre not in datastructures.GENRES:
+        raise ValueError(f"Unknown genre: {genre}")
+    return genre
+
+
+def run_query(graph: datastructures.Graph, query: str, params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Answer the query with the given name and parameters on graph and return the result as a dictionary.
+
+    The available queries are:
+        - lookup: 'name' or 'id' of an actor or movie, returns both.
+        - collaborative_performance: 'actors', a list of names, returns the rating of their shared movies as
+          'score' (None if there are none).
+        - best_movie: 'actors', a list of names, returns the id and name of their best rated shared movie
+          (None if there is none).
+        - casting_team: 'actor', a name, as well as 'number_of_actors' and 'min_num_collab', returns the names of
+          the 'costars'.
+        - timeline: 'actors', a list of one or two names, and optionally 'start_year' and 'end_year', returns the
+          average rating of their (shared) movies released in those years as 'score' (None if there are none), and
+          the number of movies and average rating of every year as 'years'.
+        - similar_actors: 'actor', a name, and 'number_of_actors', returns the names and 'similarity' of the actors
+          whose movies overlap most with theirs as 'actors'. The similarity index used can be tuned with 'num_perm'
+          and 'bands' (see datastructures.MinHashIndex): more bands find more similar actors but take longer.
+
+    collaborative_performance and casting_team take an optional scoring 'method' (see
+    datastructures.SCORING_METHODS), which is 'mean' by default. They and best_movie also take an optional 'genre'
+    (see datastructures.GENRES), to only count the movies of that genre.
+
+    Raise a ValueError if the query or its parameters are invalid, or if a name isn't in the graph.
+    """
+    if query == "lookup":
+        if "name" in params:
+            name = str(params["name"])
+            try:
+                return {"name": name, "id": graph.get_id(name)}
+            except ValueError:
+                raise ValueError(f"Name not found: {name}") from None
+        elif "id" in params:
+            db_id = str(params["id"])
+            try:
+                return {"name": graph.get_name(db_id), "id": db_id}
+            except ValueError:
+                raise ValueError(f"Id not found: {db_id}") from None
+        else:
+            raise ValueError("lookup needs a 'name' or an 'id'")
+
+    elif query == "collaborative_performance":
+        actors = _actor_ids(graph, params.get("actors"))
+        score = graph.evaluate_collaborative_performance(actors, _scoring_method(params), _genre(params))
+        return {"actors": actors, "score": score if score != -1 else None}
+
+    elif query == "best_movie":
+        actors = _actor_ids(graph, params.get("actors"))
+        movie = graph.find_best_movie_together(actors, _genre(params))
+        if movie == "/N":
+            return {"actors": actors, "movie_id": None, "movie": None}
+        return {"actors": actors, "movie_id": movie, "movie": graph.get_name(movie)}
+
+    elif query == "casting_team":
+        if not isinstance(params.get("actor"), str):
+            raise ValueError("'actor' has to be an actor name")
+        actor = _actor_ids(graph, [params["actor"]])[0]
+        number_of_actors = _positive_int(params, "number_of_actors", 5)
+        min_num_collab = _positive_int(params, "min_num_collab", 1)
+        costars = graph.find_casting_team(actor, number_of_actors, min_num_collab, _scoring_method(params),
+                                          _genre(params))
+        return {"actor": actor, "costars": costars}
+
+    elif query == "timeline":
+        actors = _actor_ids(graph, params.get("actors"))
+        if len(actors) > 2:
+            raise ValueError("'actors' has to be one or two actor names")
+        start_year, end_year = _year(params, "start_year"), _year(params, "end_year")
+        score = graph.get_average_rating(actors, start_year, end_year)
+        years = [{"year": year, "movies": movies, "rating": rating}
+                 for year, movies, rating in graph.get_career_timeline(actors)
+                 if (start_year == -1 or year >= start_year) and (end_year == -1 or year <= end_year)]
+        return {"actors": actors, "score": score if score != -1 else None, "years": years}
+
+    elif query == "similar_actors":
+        if not isinstance(params.get("actor"), str):
+            raise ValueError("'actor' has to be an actor name")
+        actor = _actor_ids(graph, [params["actor"]])[0]
+        number_of_actors = _positive_int(params, "number_of_actors", 10)
+        num_perm, bands = _positive_int(params, "num_perm", 128), _positive_int(params, "bands", 64)
+        if num_perm % bands != 0:
+            raise ValueError("'num_perm' has to be a multiple of 'bands'")
+
+        indexes = _SIMILARITY_INDEXES.setdefault(graph, {})
+        if (num_perm, bands) not in indexes:
+            indexes[(num_perm, bands)] = graph.similarity_index(num_perm, bands)
+        similar = indexes[(num_perm, bands)].most_similar(actor, number_of_actors)
+        return {"actor": actor, "actors": [{"name": graph.get_name(costar), "similarity": similarity}
+                                           for costar, similarity in similar]}
+
+    else:
+        raise ValueError(f"Unknown query: {query}")
+
+
+def _init_worker(files: tuple[str, str, str, str]) -> None:
+    """Initializer of the worker processes, which loads the graph unless it was inherited from the parent."""
+    global _WORKER_GRAPH
+    if _WORKER_GRAPH is None:
+        _WORKER_GRAPH = load_graph(*files)
+
+
+def start_worker_pool(graph: datastructures.Graph, files: tuple[str, str, str, str],
+                      workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Start a pool of worker processes for run_in_worker. Workers share the given graph if processes are forked, and
+    otherwise load it from files.
+    """
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = graph
+    return concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(files,))
+
+
+def run_in_worker(query: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Answer a query on the graph of a worker process started with start_worker_pool. See run_query."""
+    return run_query(_WORKER_GRAPH, query, params)
@@ -0,0 +1,205 @@
+"""
+Headless query server which loads the movie graph once and answers queries over a local HTTP/JSON API, as an
+alternative to main.py for other programs that want to use our functions.
+
+Every query of queries.run_query is available under its own path, either as a GET request with the parameters in
+the query string (repeat 'actors' for multiple actors) or as a POST request with a json object as body:
+
+    GET  /lookup?name=Morgan+Freeman
+    GET  /collaborative_performance?actors=Brad+Pitt&actors=Edward+Norton
+    GET  /similar_actors?actor=Tom+Hanks&number_of_actors=10
+    POST /casting_team   {"actor": "Tom Hanks", "number_of_actors": 5, "min_num_collab": 3}
+    GET  /metrics
+
+Expensive queries (queries.HEAVY_QUERIES) run in a pool of worker processes so they don't block the other requests.
+"""
+from __future__ import annotations
+from typing import Any
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import math
+import statistics
+import time
+import urllib.parse
+
+import datastructures
+import queries
+
+MAX_BODY_SIZE = 1 << 20
+LATENCY_WINDOW = 1000
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class Metrics:
+    """Request counts and latencies of the server, per path.
+
+    Instance Attributes:
+        - started: The time the server was started, from time.time().
+    """
+    started: float
+    # Private Instance Attributes:
+    #     - _counts:
+    #         Maps path to the number of requests, the number of failed requests and the total latency.
+    #     - _latencies:
+    #         Maps path to the latencies of its most recent requests.
+    _counts: dict[str, list]
+    _latencies: dict[str, collections.deque]
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.started = time.time()
+        self._counts = {}
+        self._latencies = {}
+
+    def record(self, path: str, seconds: float, failed: bool) -> None:
+        """Record a request to the given path which took the given number of seconds."""
+        counts = self._counts.setdefault(path, [0, 0, 0.0])
+        counts[0] += 1
+        counts[1] += int(failed)
+        counts[2] += seconds
+        self._latencies.setdefault(path, collections.deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the metrics as a json compatible dictionary, with latencies in milliseconds."""
+        paths = {}
+        for path, (requests, errors, total) in self._counts.items():
+            latencies = sorted(self._latencies[path])
+            paths[path] = {"requests": requests, "errors": errors,
+                           "mean_ms": 1000 * total / requests,
+                           "p50_ms": 1000 * statistics.median(latencies),
+                           "p95_ms": 1000 * latencies[math.ceil(0.95 * len(latencies)) - 1],
+                           "max_ms": 1000 * latencies[-1]}
+        return {"uptime_seconds": time.time() - self.started, "paths": paths}
+
+
+class QueryServer:
+    """An asyncio HTTP server answering queries on a movie graph.
+
+    Instance Attributes:
+        - graph: The movie graph queries are answered on.
+        - metrics: The request metrics of this server.
+    """
+    graph: datastructures.Graph
+    metrics: Metrics
+    # Private Instance Attributes:
+    #     - _pool:
+    #         The worker processes for expensive queries, or None if they run in the server process.
+    _pool: concurrent.futures.ProcessPoolExecutor | None
+
+    def __init__(self, graph: datastructures.Graph, pool: concurrent.futures.ProcessPoolExecutor | None) -> None:
+        """Initialize a server for the given graph, running expensive queries in pool."""
+        self.graph = graph
+        self.metrics = Metrics()
+        self._pool = pool
+
+    async def answer(self, method: str, target: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        """Return the status code and json response for a request with the given method, target and body."""
+        url = urllib.parse.urlsplit(target)
+        query = url.path.strip("/")
+
+        if query == "metrics":
+            return 200, self.metrics.summary()
+        if method == "GET":
+            params = {key: values if key == "actors" else values[-1]
+                      for key, values in urllib.parse.parse_qs(url.query).items()}
+        elif method == "POST":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "The body has to be a json object"}
+            if not isinstance(params, dict):
+                return 400, {"error": "The body has to be a json object"}
+        else:
+            return 405, {"error": f"Method not allowed: {method}"}
+
+        try:
+            if query in queries.HEAVY_QUERIES and self._pool is not None:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._pool, queries.run_in_worker, query, params)
+            else:
+                result = queries.run_query(self.graph, query, params)
+        except ValueError as error:
+            status = 404 if str(error).startswith("Unknown query") else 400
+            return status, {"error": str(error)}
+
+        return 200, result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle a single HTTP connection."""
+        start = time.perf_counter()
+        path = "?"
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if line == "":
+                    break
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            if len(request_line) != 3:
+                status, response = 400, {"error": "Malformed request"}
+            elif int(headers.get("content-length", 0)) > MAX_BODY_SIZE:
+                status, response = 413, {"error": "Request body too large"}
+            else:
+                method, target, _ = request_line
+                path = urllib.parse.urlsplit(target).path
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response = await self.answer(method, target, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = 400, {"error": "Malformed request"}
+        except Exception as error:  # the server has to keep running whatever a query does
+            status, response = 500, {"error": repr(error)}
+
+        payload = json.dumps(response).encode("utf8")
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+        self.metrics.record(path, time.perf_counter() - start, status != 200)
+
+
+async def serve(graph: datastructures.Graph, host: str, port: int,
+                pool: concurrent.futures.ProcessPoolExecutor | None) -> None:
+    """Run a query server for graph on the given host and port until it is cancelled."""
+    server = QueryServer(graph, pool)
+    async with await asyncio.start_server(server.handle, host, port) as tcp_server:
+        print(f"Serving queries on http://{host}:{port}")
+        await tcp_server.serve_forever()
+
+
+def main() -> None:
+    """Load the graph and run the query server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve movie graph queries over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8000, help="port to listen on")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="number of worker processes for expensive queries, 0 to run them in the server")
+    parser.add_argument('--files', nargs=4, default=queries.SAMPLE_DATASET,
+                        metavar=('ACTORS', 'TITLES', 'RATINGS', 'PRINCIPALS'), help="dataset files to load")
+    args = parser.parse_args()
+
+    files = tuple(args.files)
+    graph = queries.load_graph(*files)
+    pool = None
+    if args.workers > 0:
+        pool = queries.start_worker_pool(graph, files, args.workers)
+
+    try:
+        asyncio.run(serve(graph, args.host, args.port, pool))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
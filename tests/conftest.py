@@ -0,0 +1,71 @@
+"""
+Shared fixtures of the tests. The modules of the program live in src/ and import each other by their flat names, so
+src/ is put on the path first.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import datastructures  # noqa: E402
+from data import synthetic_db  # noqa: E402
+
+# A small dataset in the format of the filtered files, with an unrated title which is left out of the graph
+ACTORS = [['nconst', 'primaryName', 'birthYear', 'deathYear'],
+          ['nm0000001', 'Ann', '1970', '\\N'], ['nm0000002', 'Bob', '1980', '\\N'], ['nm0000003', 'Cid', '\\N', '\\N']]
+TITLES = [['tconst', 'primaryTitle', 'startYear', 'runtimeMinutes', 'genres'],
+          ['tt0000001', 'Rated Movie', '2000', '100', 'Drama'], ['tt0000002', 'Unrated Movie', '2001', '90', 'Comedy']]
+RATINGS = [['tconst', 'averageRating', 'numVotes'], ['tt0000001', '7.5', '1000']]
+PRINCIPALS = [['tt0000001', 'nm0000001'], ['tt0000001', 'nm0000002'], ['tt0000002', 'nm0000003']]
+
+
+@pytest.fixture(scope='session')
+def synthetic_files(tmp_path_factory) -> tuple[str, str, str, str]:
+    """The files of a small synthetic dataset."""
+    return synthetic_db.generate_dataset(str(tmp_path_factory.mktemp('synthetic')), 600, 400, seed=1)
+
+
+@pytest.fixture(scope='session')
+def synthetic_graph(synthetic_files) -> datastructures.Graph:
+    """The movie graph of the small synthetic dataset, with the ratings of all actors evaluated."""
+    graph = datastructures.Graph()
+    graph.load_movie_graph(*synthetic_files)
+    graph.evaluate_all_actor_ratings()
+    return graph
+
+
+def make_graph(movies: dict[str, list[str]], ratings: dict[str, float] | None = None,
+               votes: dict[str, int] | None = None) -> datastructures.Graph:
+    """Return a graph with the given movies, mapping movie id to the ids of its actors. Every actor is called
+    'Actor <id>' and every movie 'Movie <id>', and every movie is a drama. Movies are rated 5 with 100 votes unless
+    given otherwise in ratings and votes.
+    """
+    ratings, votes = ratings or {}, votes or {}
+    graph = datastructures.Graph()
+    items = [datastructures.Actor(actor, f"Actor {actor}", 1970, -1)
+             for actor in sorted({actor for cast in movies.values() for actor in cast})]
+    items.extend(datastructures.Movie(movie, f"Movie {movie}", 2000, '100', 'Drama',
+                                      rating=ratings.get(movie, 5.0), votes=votes.get(movie, 100)) for movie in movies)
+    for item in items:
+        graph.add_vertex(item)
+        graph._names_to_ids[item.name] = item.key
+    for movie, cast in movies.items():
+        for actor in cast:
+            graph.add_edge(movie, actor)
+    return graph
+
+
+@pytest.fixture
+def loaded_graph(tmp_path) -> datastructures.Graph:
+    """A graph loaded from files with a rated movie, and an unrated title which isn't part of the graph."""
+    files = []
+    for name, rows in (('actors', ACTORS), ('titles', TITLES), ('ratings', RATINGS), ('principals', PRINCIPALS)):
+        path = tmp_path / f'{name}.tsv'
+        path.write_text(''.join('\t'.join(row) + '\n' for row in rows), encoding='utf8')
+        files.append(str(path))
+    graph = datastructures.Graph()
+    graph.load_movie_graph(*files)
+    graph.evaluate_all_actor_ratings()
+    return graph
@@ -0,0 +1,82 @@
+"""
+Tests of the degrees of separation queries, Graph.find_connection and Graph.find_best_rated_connection.
+"""
+import random
+
+import networkx as nx
+import pytest
+
+from conftest import make_graph
+
+
+def _check_path(graph, path: list[str], actor1: str, actor2: str) -> None:
+    """Check that path goes from actor1 to actor2, alternating between actors and movies they played in."""
+    assert path[0] == actor1 and path[-1] == actor2
+    assert all(db_id.startswith('nm') for db_id in path[::2])
+    assert all(db_id.startswith('tt') for db_id in path[1::2])
+    assert all(graph.adjacent(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+
+def test_find_connection_is_shortest(synthetic_graph) -> None:
+    """find_connection returns valid paths as short as the shortest paths networkx finds."""
+    _, actors, movies = synthetic_graph.to_biadjacency()
+    graph_nx = nx.Graph()
+    graph_nx.add_nodes_from(actors + movies)
+    graph_nx.add_edges_from((actor, neighbour.db_id) for actor in actors
+                            for neighbour in synthetic_graph.get_neighbours(actor))
+
+    rng = random.Random(0)
+    for _ in range(200):
+        actor1, actor2 = rng.sample(actors, 2)
+        path = synthetic_graph.find_connection(actor1, actor2)
+        if nx.has_path(graph_nx, actor1, actor2):
+            _check_path(synthetic_graph, path, actor1, actor2)
+            assert len(path) - 1 == nx.shortest_path_length(graph_nx, actor1, actor2)
+        else:
+            assert path == []
+
+
+def test_find_best_rated_connection(synthetic_graph) -> None:
+    """find_best_rated_connection returns valid paths of the same cost as networkx's Dijkstra."""
+    _, actors, movies = synthetic_graph.to_biadjacency()
+    ratings = dict(zip(movies, synthetic_graph.movie_ratings().tolist()))
+    graph_nx = nx.DiGraph()
+    for actor in actors:
+        for movie in synthetic_graph.get_neighbours(actor):
+            graph_nx.add_edge(actor, movie.db_id, weight=11 - ratings[movie.db_id])
+            graph_nx.add_edge(movie.db_id, actor, weight=0)
+
+    rng = random.Random(1)
+    for _ in range(50):
+        actor1, actor2 = rng.sample(actors, 2)
+        path = synthetic_graph.find_best_rated_connection(actor1, actor2)
+        if actor1 in graph_nx and actor2 in graph_nx and nx.has_path(graph_nx, actor1, actor2):
+            _check_path(synthetic_graph, path, actor1, actor2)
+            cost = sum(11 - ratings[movie] for movie in path[1::2])
+            assert cost == pytest.approx(nx.dijkstra_path_length(graph_nx, actor1, actor2))
+        else:
+            assert path == []
+
+
+def test_disconnected_actors() -> None:
+    """Actors in different components are not connected."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002'], 'tt0000002': ['nm0000003', 'nm0000004']})
+    assert graph.find_connection('nm0000001', 'nm0000004') == []
+    assert graph.find_best_rated_connection('nm0000001', 'nm0000004') == []
+    assert graph.find_connection('nm0000001', 'nm0000002') == ['nm0000001', 'tt0000001', 'nm0000002']
+
+
+def test_same_actor() -> None:
+    """The path from an actor to themself is just the actor, with their id formatted by the graph."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002']})
+    assert graph.find_connection('nm0000001', 'nm0000001') == ['nm0000001']
+    assert graph.find_best_rated_connection('nm0000001', 'nm0000001') == ['nm0000001']
+
+
+def test_unknown_actor() -> None:
+    """Ids which aren't actors in the graph raise a ValueError."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002']})
+    with pytest.raises(ValueError):
+        graph.find_connection('nm0000001', 'nm0000009')
+    with pytest.raises(ValueError):
+        graph.find_connection('nm0000001', 'tt0000001')
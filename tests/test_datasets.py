@@ -0,0 +1,32 @@
+"""
+Tests of the cache of loaded graphs.
+"""
+import datasets
+from conftest import make_graph
+
+
+class _CountingDict(dict):
+    """A dictionary which counts how often its values are iterated over."""
+    scans: int = 0
+
+    def values(self):
+        self.scans += 1
+        return super().values()
+
+
+def test_memory_is_estimated_again_only_when_matrices_are_built(monkeypatch) -> None:
+    """Cache hits don't scan the graph, but the estimate grows once the graph builds its matrices."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002'], 'tt0000002': ['nm0000002', 'nm0000003']})
+    monkeypatch.setattr(datasets.queries, 'load_graph', lambda *files: graph)
+    cache = datasets.GraphCache()
+    files = ('actors', 'titles', 'ratings', 'principals')
+
+    cache.get(files)
+    loaded = cache.memory()
+    graph._vertices = _CountingDict(graph._vertices)
+    assert cache.get(files) is graph
+    assert graph._vertices.scans == 0 and cache.memory() == loaded
+
+    graph._get_adjacency()
+    cache.get(files)
+    assert graph._vertices.scans == 1 and cache.memory() > loaded
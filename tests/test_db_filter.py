@@ -0,0 +1,41 @@
+"""
+Tests of the filters of the full IMDb database, data/db_filter.py.
+"""
+import os
+
+from data import db_filter, synthetic_db
+
+
+def _read(directory: str) -> dict[str, str]:
+    """Return the contents of every file in the given directory, by file name."""
+    contents = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'r', encoding='utf8') as file:
+            contents[name] = file.read()
+    return contents
+
+
+def test_bounded_filter_by_num_matches_in_memory(tmp_path, monkeypatch) -> None:
+    """The bounded filter writes the same files as filter_by_num, even when it has to spill many runs and merge them
+    in several passes.
+    """
+    files = synthetic_db.generate_imdb_dataset(str(tmp_path / 'imdb'), 3000, 3000, seed=2)
+    monkeypatch.setattr(db_filter, 'MERGE_RESERVE', 0)
+    monkeypatch.setattr(db_filter, 'MAX_MERGED_RUNS', 4)
+    spills = []
+    spill = db_filter._spill
+    monkeypatch.setattr(db_filter, '_spill', lambda rows, column, temp_dir: spills.append(len(rows)) or
+                        spill(rows, column, temp_dir))
+
+    (tmp_path / 'in_memory').mkdir()
+    monkeypatch.chdir(tmp_path / 'in_memory')
+    db_filter.filter_by_num(*files, 200)
+    (tmp_path / 'bounded').mkdir()
+    monkeypatch.chdir(tmp_path / 'bounded')
+    db_filter.filter_by_num_bounded(*files, 200, memory_budget=64 * 2 ** 10, temp_dir=str(tmp_path))
+
+    assert len(spills) > db_filter.MAX_MERGED_RUNS
+    expected = _read(str(tmp_path / 'in_memory' / 'db_200_movies'))
+    assert len(expected['titles.tsv'].splitlines()) == 200
+    assert _read(str(tmp_path / 'bounded' / 'db_200_movies')) == expected
+    assert sorted(os.listdir(tmp_path)) == ['bounded', 'imdb', 'in_memory']
@@ -0,0 +1,66 @@
+"""
+Tests of the genre bitmasks of movies and of the genre filters of the queries.
+"""
+import random
+
+import pytest
+
+import datastructures
+
+
+def test_genre_mask_round_trip() -> None:
+    """The genres of a mask come back in the order of GENRES, without the genres which aren't known."""
+    mask = datastructures.genre_mask('Western,Drama,Not A Genre,Action')
+    assert datastructures.genre_names(mask) == ['Action', 'Drama', 'Western']
+    assert datastructures.genre_mask('\\N') == datastructures.genre_mask('') == 0
+    assert datastructures.genre_names(0) == []
+    for genre in datastructures.GENRES:
+        assert datastructures.genre_names(datastructures.genre_mask(genre)) == [genre]
+
+
+def _actors_with_costars(graph: datastructures.Graph, number: int) -> list[tuple[str, str]]:
+    """Return some actors of the graph together with one of their costars."""
+    rng = random.Random(0)
+    pairs = []
+    for actor in sorted(graph.get_all_vertices(datastructures.Actor), key=lambda a: a.db_id):
+        costars = sorted({u.db_id for movie in graph.get_neighbours(actor.db_id)
+                          for u in graph.get_neighbours(movie.db_id) if u is not actor})
+        if costars != []:
+            pairs.append((actor.db_id, rng.choice(costars)))
+    return rng.sample(pairs, number)
+
+
+@pytest.mark.parametrize('genre', ['Drama', 'Comedy', 'Sci-Fi'])
+def test_genre_queries_match_views(synthetic_graph, genre) -> None:
+    """Queries with a genre give the same answers as the same queries on a view of only that genre."""
+    view = synthetic_graph.filter_view(genre=genre)
+    for actor, costar in _actors_with_costars(synthetic_graph, 40):
+        for method in datastructures.SCORING_METHODS:
+            assert synthetic_graph.evaluate_collaborative_performance([actor, costar], method, genre) == \
+                pytest.approx(view.evaluate_collaborative_performance([actor, costar], method))
+
+        # Movies with the same rating may be chosen in either order, so their ratings are compared
+        best, best_in_view = (graph.find_best_movie_together([actor, costar], *args)
+                              for graph, args in ((synthetic_graph, (genre,)), (view, ())))
+        assert (best == '/N') == (best_in_view == '/N')
+        if best != '/N':
+            ratings = {movie.db_id: movie.rating for movie in synthetic_graph.get_all_vertices(datastructures.Movie)}
+            assert ratings[best] == ratings[best_in_view]
+
+        team = synthetic_graph.find_casting_team(actor, 10 ** 6, 1, 'mean', genre)
+        assert sorted(team) == sorted(view.find_casting_team(actor, 10 ** 6, 1))
+
+
+def test_genre_ratings_brute_force(synthetic_graph) -> None:
+    """The number and average rating of the movies of every genre of an actor match counting them one by one."""
+    for actor, _ in _actors_with_costars(synthetic_graph, 40):
+        expected = {}
+        for movie in synthetic_graph.get_neighbours(actor):
+            for genre in movie.genre.split(','):
+                expected.setdefault(genre, []).append(movie.rating)
+
+        ratings = synthetic_graph.get_genre_ratings(actor)
+        assert set(ratings) == set(expected)
+        for genre, (count, average) in ratings.items():
+            assert count == len(expected[genre])
+            assert average == pytest.approx(sum(expected[genre]) / count)
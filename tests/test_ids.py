@@ -0,0 +1,53 @@
+"""
+Tests of the integer keys of IMDb ids, in datastructures and in data/db_filter.py.
+"""
+import pytest
+
+import datastructures
+from data import db_filter
+
+CANONICAL = ['tt0000001', 'nm0000001', 'nm0000102', 'tt9999999', 'tt10000000', 'nm12345678']
+NOT_IDS = ['tconst', 'nm', 'nm123', 'tt000000001', 'nm00000001', 'xx0000001', 'nm00000a1', 'nm000000²', '']
+
+
+@pytest.mark.parametrize('db_id', CANONICAL)
+def test_round_trip(db_id) -> None:
+    """Ids are decoded back into themselves, and both modules give them the same key."""
+    key = datastructures.encode_id(db_id)
+    assert datastructures.decode_id(key) == db_id
+    assert db_filter._encode_id(db_id) == key
+
+
+def test_keys_round_trip() -> None:
+    """Keys are encoded back into themselves."""
+    for key in [0, 1, 204, 205, 2 * 10 ** 7, 2 * 10 ** 7 + 1, 2 * 10 ** 9 + 1]:
+        assert datastructures.encode_id(datastructures.decode_id(key)) == key
+
+
+@pytest.mark.parametrize('db_id', NOT_IDS)
+def test_not_ids(db_id) -> None:
+    """Strings which aren't ids in their canonical form are rejected the same way by both modules."""
+    with pytest.raises(ValueError):
+        datastructures.encode_id(db_id)
+    with pytest.raises(ValueError):
+        db_filter._encode_id(db_id)
+    assert db_filter._key(db_id) == -1
+
+
+def test_compatible_actor_ids(synthetic_graph) -> None:
+    """The projection and the similarity index still list the ids of their actors in row order."""
+    _, actor_ids, _ = synthetic_graph.to_biadjacency()
+    assert datastructures.CoStarGraph(synthetic_graph).actor_ids == actor_ids
+    assert synthetic_graph.similarity_index().actor_ids == actor_ids
+
+
+def test_lookups(loaded_graph) -> None:
+    """Lookups only parse the number of an id, but items are still only built from ids in their canonical form."""
+    assert loaded_graph.get_name('nm2') == loaded_graph.get_name('nm0000002') == 'Bob'
+    for db_id in ('nm0000009', 'tconst', ''):
+        with pytest.raises(ValueError):
+            loaded_graph.get_name(db_id)
+    with pytest.raises(ValueError):
+        datastructures.Actor('nm2', 'Bob', 1980, -1)
+    with pytest.raises(AttributeError):
+        datastructures.Actor('nm0000002', 'Bob', 1980, -1).db_id = 'nm0000003'
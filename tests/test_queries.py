@@ -0,0 +1,55 @@
+"""
+Tests of answering queries by name, queries.run_query, and of the batch mode built on it.
+"""
+import io
+import json
+
+import pytest
+
+import batch
+import queries
+
+
+@pytest.mark.parametrize('query, params', [
+    ('collaborative_performance', {'actors': ['Unrated Movie', 'Ann']}),
+    ('collaborative_performance', {'actors': ['Ann', 'Rated Movie']}),
+    ('best_movie', {'actors': ['Rated Movie']}),
+    ('casting_team', {'actor': 'Unrated Movie'}),
+    ('casting_team', {'actor': 'Rated Movie'}),
+    ('timeline', {'actors': ['Ann', 'Unrated Movie']}),
+    ('similar_actors', {'actor': 'Rated Movie'}),
+    ('collaborative_performance', {'actors': ['Nobody']}),
+])
+def test_names_which_are_not_actors(loaded_graph, query, params) -> None:
+    """Names of movies, unrated titles and unknown names are rejected with a ValueError naming them."""
+    with pytest.raises(ValueError, match='Actor not found'):
+        queries.run_query(loaded_graph, query, params)
+
+
+def test_actor_queries(loaded_graph) -> None:
+    """Queries with actor names are answered with their ids."""
+    result = queries.run_query(loaded_graph, 'collaborative_performance', {'actors': ['Ann', 'Bob']})
+    assert result == {'actors': ['nm0000001', 'nm0000002'], 'score': 7.5}
+    assert queries.run_query(loaded_graph, 'casting_team', {'actor': 'Ann'})['costars'] == ['Bob']
+
+
+def test_batch_continues_after_bad_lines(loaded_graph) -> None:
+    """A line with a name which isn't an actor gets an error, and the lines after it are still answered."""
+    lines = 'collaborative_performance\tUnrated Movie, Ann\nlookup\tBob\nnot a query\n'
+    output = io.StringIO()
+    assert batch.run_batch(loaded_graph, io.StringIO(lines), output, 'tsv', ('', '', '', '')) == 3
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert results[0]['error'] == 'Actor not found: Unrated Movie'
+    assert results[1]['result'] == {'name': 'Bob', 'id': 'nm0000002'}
+    assert 'error' in results[2]
+
+
+def test_similar_actors_index_parameters(loaded_graph) -> None:
+    """Every (num_perm, bands) gets its own cached index, and bands which don't divide num_perm are rejected."""
+    first = queries.run_query(loaded_graph, 'similar_actors', {'actor': 'Ann', 'num_perm': 16, 'bands': 8})
+    second = queries.run_query(loaded_graph, 'similar_actors', {'actor': 'Ann'})
+    assert first['actors'] == second['actors'] == [{'name': 'Bob', 'similarity': 1.0}]
+    assert set(queries._SIMILARITY_INDEXES[loaded_graph]) == {(16, 8), (128, 64)}
+    with pytest.raises(ValueError, match="multiple of 'bands'"):
+        queries.run_query(loaded_graph, 'similar_actors', {'actor': 'Ann', 'num_perm': 16, 'bands': 5})
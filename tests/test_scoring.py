@@ -0,0 +1,57 @@
+"""
+Tests of the scoring methods of actors and pairs of actors, datastructures.SCORING_METHODS.
+"""
+import pytest
+
+import datastructures
+from conftest import make_graph
+
+# nm0000001 played in the first two movies, nm0000002 in the first and the last, which has no votes (so it counts as
+# a single vote), and nm0000003 only in the last
+MOVIES = {'tt0000001': ['nm0000001', 'nm0000002'], 'tt0000002': ['nm0000001'], 'tt0000003': ['nm0000002', 'nm0000003']}
+RATINGS = {'tt0000001': 8.0, 'tt0000002': 6.0, 'tt0000003': 4.0}
+VOTES = {'tt0000001': 300, 'tt0000002': 100, 'tt0000003': 0}
+
+# The vote weighted average rating of all movies, and the votes of the median movie
+PRIOR = ((8.0 * 300 + 6.0 * 100 + 4.0 * 1) / 401, 100.0)
+
+
+def _bayesian(weighted_sum: float, weight_sum: float) -> float:
+    """The bayesian score of movies with the given sum of vote weighted ratings and sum of votes."""
+    return (PRIOR[1] * PRIOR[0] + weighted_sum) / (PRIOR[1] + weight_sum)
+
+
+def test_scoring_prior() -> None:
+    """The prior is the vote weighted mean rating of all movies, weighted by the votes of the median movie."""
+    graph = make_graph(MOVIES, RATINGS, VOTES)
+    assert graph.scoring_prior() == pytest.approx(PRIOR)
+
+
+@pytest.mark.parametrize('method, expected', [
+    ('mean', {'nm0000001': 7.0, 'nm0000002': 6.0, 'nm0000003': 4.0}),
+    ('votes', {'nm0000001': (8.0 * 300 + 6.0 * 100) / 400, 'nm0000002': (8.0 * 300 + 4.0) / 301, 'nm0000003': 4.0}),
+    ('bayesian', {'nm0000001': _bayesian(8.0 * 300 + 6.0 * 100, 400), 'nm0000002': _bayesian(8.0 * 300 + 4.0, 301),
+                  'nm0000003': _bayesian(4.0, 1)}),
+])
+def test_score_actors(method, expected) -> None:
+    """Actors are scored by hand computed values, with movies without votes counted as a single vote."""
+    graph = make_graph(MOVIES, RATINGS, VOTES)
+    assert graph.score_actors(method) == pytest.approx(expected)
+
+    graph.evaluate_all_actor_ratings(method)
+    ratings = {actor.db_id: actor.rating for actor in graph.get_all_vertices(datastructures.Actor)}
+    assert ratings == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('method', ['mean', 'votes', 'bayesian'])
+def test_pair_scores_agree(method) -> None:
+    """A pair gets the same score from evaluate_collaborative_performance and from the co-star projection."""
+    graph = make_graph(MOVIES, RATINGS, VOTES)
+    projection = graph.costar_projection(method)
+    for pair in [('nm0000001', 'nm0000002'), ('nm0000002', 'nm0000003')]:
+        assert graph.evaluate_collaborative_performance(list(pair), method) == \
+            pytest.approx(projection.get_collaborative_rating(*pair))
+
+    assert graph.evaluate_collaborative_performance(['nm0000001', 'nm0000002'], 'bayesian') == \
+        pytest.approx(_bayesian(8.0 * 300, 300))
+    assert graph.evaluate_collaborative_performance(['nm0000002', 'nm0000003'], 'votes') == 4.0
@@ -0,0 +1,29 @@
+"""
+Tests of the responses of the query server, server.QueryServer.
+"""
+import asyncio
+
+import queries
+import server
+
+
+def _answer(query_server: server.QueryServer, method: str, target: str, body: bytes = b'') -> tuple[int, dict]:
+    """Return the status and response of the server for the given request."""
+    return asyncio.run(query_server.answer(method, target, body))
+
+
+def test_bad_names_are_bad_requests(loaded_graph) -> None:
+    """Names which aren't actors get a 400 with a message, not a 500."""
+    query_server = server.QueryServer(loaded_graph, None)
+    status, response = _answer(query_server, 'GET', '/collaborative_performance?actors=Unrated+Movie&actors=Ann')
+    assert (status, response) == (400, {'error': 'Actor not found: Unrated Movie'})
+    status, response = _answer(query_server, 'POST', '/similar_actors', b'{"actor": "Rated Movie"}')
+    assert (status, response) == (400, {'error': 'Actor not found: Rated Movie'})
+    assert _answer(query_server, 'GET', '/nothing')[0] == 404
+
+
+def test_indexing_queries_are_heavy() -> None:
+    """similar_actors and timeline build an index of the whole graph on their first call, so they run in the worker
+    processes.
+    """
+    assert {'similar_actors', 'timeline'} <= queries.HEAVY_QUERIES
@@ -0,0 +1,83 @@
+"""
+Tests of the MinHash index of similar actors.
+"""
+import numpy as np
+import pytest
+
+import datastructures
+from conftest import make_graph
+
+
+def test_band_keys_match_signature_keys(synthetic_graph) -> None:
+    """The band keys computed for all actors at once are the ones computed for a single actor's movies."""
+    index = synthetic_graph.similarity_index()
+    for band in range(index.bands):
+        for key, row in list(zip(index._band_keys[band].tolist(), index._band_actors[band].tolist()))[:50]:
+            movies = index._movies(datastructures.decode_id(int(index._actor_keys[row])))
+            assert index._signature_keys(movies)[band] == key
+
+
+def test_identical_filmographies_are_candidates(synthetic_graph) -> None:
+    """Actors with the same movies have the same signature, so they always find each other."""
+    index = synthetic_graph.similarity_index()
+    matrix, actor_keys, _ = synthetic_graph._get_biadjacency()
+    rows = {}
+    for i in range(matrix.shape[0]):
+        movies = tuple(matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]].tolist())
+        if movies != ():
+            rows.setdefault(movies, []).append(datastructures.decode_id(int(actor_keys[i])))
+
+    twins = [actors for actors in rows.values() if len(actors) > 1]
+    assert twins != []
+    for actors in twins:
+        for actor in actors:
+            assert set(actors) - {actor} <= set(index.candidates(actor))
+
+
+def test_near_duplicates_of_known_pair() -> None:
+    """Two actors credited together in every movie are found with similarity 1, and nobody else is."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002', 'nm0000003'],
+                        'tt0000002': ['nm0000001', 'nm0000002'],
+                        'tt0000003': ['nm0000001', 'nm0000002', 'nm0000004'],
+                        'tt0000004': ['nm0000003', 'nm0000004']})
+    index = graph.similarity_index()
+    assert index.near_duplicates(0.8) == [('nm0000001', 'nm0000002', 1.0)]
+    assert index.most_similar('nm0000001', 1) == [('nm0000002', 1.0)]
+
+
+def test_empty_graph() -> None:
+    """An index of a graph without actors or movies finds nothing."""
+    index = datastructures.Graph().similarity_index()
+    assert index.near_duplicates() == []
+    with pytest.raises(ValueError, match='Actor not found'):
+        index.most_similar('nm0000001')
+
+
+def test_movie_is_not_an_actor(loaded_graph) -> None:
+    """Looking up a movie in the index names it in the error."""
+    index = loaded_graph.similarity_index()
+    with pytest.raises(ValueError, match='Actor not found: tt0000001'):
+        index.candidates('tt0000001')
+
+
+def test_most_similar_recall(synthetic_graph) -> None:
+    """With the default bands, most_similar finds the actor with the highest exact Jaccard similarity for nearly every
+    actor, and never reports a similarity other than the exact one.
+    """
+    index = synthetic_graph.similarity_index()
+    matrix, actor_keys, _ = synthetic_graph._get_biadjacency()
+    matrix = matrix.astype(float)
+    intersections = (matrix @ matrix.T).toarray()
+    sizes = np.diff(matrix.indptr)
+    jaccard = intersections / np.maximum(sizes[:, None] + sizes[None, :] - intersections, 1)
+    np.fill_diagonal(jaccard, 0)
+
+    rows = np.flatnonzero(jaccard.max(axis=1) > 0)
+    found = 0
+    for i in rows.tolist():
+        result = index.most_similar(datastructures.decode_id(int(actor_keys[i])), 1)
+        if result != []:
+            j = index._actor_index[datastructures.encode_id(result[0][0])]
+            assert result[0][1] == pytest.approx(jaccard[i, j])
+            found += result[0][1] == pytest.approx(jaccard[i].max())
+    assert found >= 0.9 * len(rows)
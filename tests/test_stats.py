@@ -0,0 +1,18 @@
+"""
+Tests of the opt-in instrumentation of Graph.
+"""
+from conftest import make_graph
+
+
+def test_nested_calls_are_recorded_once() -> None:
+    """Measured methods called by another measured method count towards the outer phase only."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002', 'nm0000003'], 'tt0000002': ['nm0000001', 'nm0000003']})
+    graph.enable_stats()
+    graph.find_casting_team('nm0000001', 5, 1)
+    graph.evaluate_collaborative_performance(['nm0000001', 'nm0000002'])
+
+    phases = graph.get_stats()['phases']
+    assert phases['find_casting_team']['calls'] == 1
+    assert phases['evaluate_collaborative_performance']['calls'] == 1
+    assert graph.get_stats()['counters']['intersections'] == sum(phase.get('intersections', 0)
+                                                                 for phase in phases.values())
@@ -0,0 +1,44 @@
+"""
+Tests of the release-year averages and career timelines of actors and pairs of actors.
+"""
+import pytest
+
+import datastructures
+from conftest import make_graph
+
+
+def test_pair_timelines_are_least_recently_used(monkeypatch) -> None:
+    """A pair which was queried again is kept when the cache is full, and the least recently queried one is dropped."""
+    monkeypatch.setattr(datastructures, 'PAIR_TIMELINE_CACHE_SIZE', 2)
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002', 'nm0000003', 'nm0000004']})
+    first, second, third = ['nm0000001', 'nm0000002'], ['nm0000001', 'nm0000003'], ['nm0000001', 'nm0000004']
+
+    graph.get_average_rating(first)
+    graph.get_average_rating(second)
+    graph.get_average_rating(first)
+    graph.get_average_rating(third)
+    assert list(graph._pair_timelines) == [(graph._key(a), graph._key(b)) for a, b in (first, third)]
+
+
+def test_timeline_errors_have_messages() -> None:
+    """Movies and the wrong number of actors are rejected with a message."""
+    graph = make_graph({'tt0000001': ['nm0000001', 'nm0000002']})
+    with pytest.raises(ValueError, match='Actor not found: tt0000001'):
+        graph.get_average_rating(['tt0000001'])
+    with pytest.raises(ValueError, match='Actor not found: tt0000001'):
+        graph.get_career_timeline(['nm0000001', 'tt0000001'])
+    with pytest.raises(ValueError, match='one or two actors'):
+        graph.get_career_timeline([])
+
+
+def test_averages_do_not_depend_on_other_actors() -> None:
+    """The averages of an actor are as exact as summing their own ratings, however many movies come before them."""
+    movies = {f'tt{i:07d}': ['nm0000001'] for i in range(1, 20001)}
+    movies['tt0100001'] = ['nm0000002']
+    movies['tt0100002'] = ['nm0000002']
+    ratings = {movie: 9.7 for movie in movies}
+    ratings.update({'tt0100001': 7.1, 'tt0100002': 8.0})
+    graph = make_graph(movies, ratings)
+
+    assert graph.get_average_rating(['nm0000002']) == (7.1 + 8.0) / 2
+    assert graph.get_career_timeline(['nm0000002']) == [(2000, 2, (7.1 + 8.0) / 2)]
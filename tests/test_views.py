@@ -0,0 +1,76 @@
+"""
+Tests of the filtered views of a movie graph, Graph.filter_view.
+"""
+import pytest
+
+import datastructures
+from conftest import make_graph
+
+
+def _graph() -> datastructures.Graph:
+    """A graph with a good and a bad movie, which share one actor."""
+    return make_graph({'tt0000001': ['nm0000001', 'nm0000002'], 'tt0000002': ['nm0000002', 'nm0000003']},
+                      {'tt0000001': 8.0, 'tt0000002': 3.0})
+
+
+def test_view_is_read_only() -> None:
+    """Adding vertices or edges to a view raises a ValueError and leaves the underlying graph unchanged."""
+    graph = _graph()
+    view = graph.filter_view(min_rating=5)
+    with pytest.raises(ValueError):
+        view.add_vertex(datastructures.Actor('nm0000009', 'Actor nm0000009', 1970, -1))
+    with pytest.raises(ValueError):
+        view.add_edge('tt0000001', 'nm0000003')
+    assert 'nm0000009' not in graph
+    assert not graph.adjacent('tt0000001', 'nm0000003')
+
+
+def test_get_all_vertices_by_kind() -> None:
+    """Vertices can be listed by kind, and a view only lists its own movies."""
+    graph = _graph()
+    view = graph.filter_view(min_rating=5)
+    assert {movie.db_id for movie in graph.get_all_vertices(datastructures.Movie)} == {'tt0000001', 'tt0000002'}
+    assert {movie.db_id for movie in view.get_all_vertices(datastructures.Movie)} == {'tt0000001'}
+    assert len(view.get_all_vertices(datastructures.Actor)) == 3
+    assert view.get_all_vertices() == {'tt0000001', 'nm0000001', 'nm0000002', 'nm0000003'}
+
+
+def test_view_caches_follow_the_graph() -> None:
+    """The cached aggregates of a view are recomputed when the matrix of the underlying graph is rebuilt."""
+    graph = _graph()
+    view = graph.filter_view(min_rating=5)
+    assert view.get_average_rating(['nm0000003']) == -1
+    assert view.get_genre_ratings('nm0000003') == {}
+
+    graph.add_edge('tt0000001', 'nm0000003')
+    assert view.get_average_rating(['nm0000003']) == 8.0
+    assert view.get_average_rating(['nm0000002', 'nm0000003']) == 8.0
+    assert view.get_genre_ratings('nm0000003') == {'Drama': (1, 8.0)}
+
+
+def test_networkx_conversions_hide_filtered_movies() -> None:
+    """Both networkx conversions of a view leave out the filtered movies and their edges."""
+    view = _graph().filter_view(min_rating=5)
+
+    graph_nx = view.to_networkx()
+    assert {item.db_id for item in graph_nx.nodes} == {'tt0000001', 'nm0000001', 'nm0000002', 'nm0000003'}
+    assert {frozenset((u.db_id, v.db_id)) for u, v in graph_nx.edges} == \
+        {frozenset(('tt0000001', 'nm0000001')), frozenset(('tt0000001', 'nm0000002'))}
+
+    sparse_nx = view.to_sparse_networkx()
+    db_ids = dict(sparse_nx.nodes(data='db_id'))
+    assert set(db_ids.values()) == {'tt0000001', 'nm0000001', 'nm0000002'}
+    assert {frozenset((db_ids[u], db_ids[v])) for u, v in sparse_nx.edges} == \
+        {frozenset(('tt0000001', 'nm0000001')), frozenset(('tt0000001', 'nm0000002'))}
+
+
+def test_view_does_not_rate_the_actors_of_the_graph() -> None:
+    """A view scores its actors on its own movies, and refuses to overwrite the shared ratings of the graph."""
+    graph = _graph()
+    graph.evaluate_all_actor_ratings()
+    view = graph.filter_view(min_rating=5)
+    assert view.score_actors()['nm0000002'] == 8.0
+    with pytest.raises(ValueError):
+        view.evaluate_all_actor_ratings()
+    actor = graph._vertices[datastructures.encode_id('nm0000002')].item
+    assert actor.rating == graph.score_actors()['nm0000002'] == 5.5